@@ -1,18 +1,110 @@
+import logging
 import os
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, Tuple
 try:
-    from mutagen import File
+    from mutagen import File, FileType
+    from mutagen.aiff import AIFF
+    from mutagen.flac import FLAC
+    from mutagen.id3 import ID3
+    from mutagen.mp3 import MP3
+    from mutagen.mp4 import MP4
+    from mutagen.wave import WAVE
 except ImportError:
     print("mutagenライブラリが必要です。pip install mutagenでインストールしてください。")
     raise
 
 
+logger = logging.getLogger(__name__)
+
+# 対応する音楽ファイルの拡張子
+SUPPORTED_FORMATS = frozenset({'.mp3', '.aiff', '.aif', '.m4a', '.aac', '.flac', '.ogg', '.wav'})
+
+# 拡張子ごとのパーサー（mutagen.Fileによる形式の判定を省略する）
+# 登録されていない拡張子はmutagen.Fileで判定する
+_PARSERS = {
+    '.mp3': MP3,
+    '.aiff': AIFF,
+    '.aif': AIFF,
+    '.wav': WAVE,
+    '.m4a': MP4,
+    '.flac': FLAC,
+}
+
+# タグ形式ごとの、各項目に対応するタグ名（優先順）
+_ID3_TAGS = {
+    'artist': ('TPE1', 'TPE2'),
+    'album': ('TALB',),
+    'title': ('TIT2',),
+    'composer': ('TCOM',),
+    'year': ('TDRC', 'TYER'),
+}
+_MP4_TAGS = {
+    'artist': ('\xa9ART',),
+    'album': ('\xa9alb',),
+    'title': ('\xa9nam',),
+    'composer': ('\xa9wrt',),
+    'year': ('\xa9day',),
+}
+_VORBIS_TAGS = {
+    'artist': ('ARTIST', 'ALBUMARTIST'),
+    'album': ('ALBUM',),
+    'title': ('TITLE',),
+    'composer': ('COMPOSER',),
+    'year': ('DATE',),
+}
+# タグ形式が特定できない場合は全形式のタグ名を試行
+_GENERIC_TAGS = {
+    'artist': ('TPE1', 'ARTIST', '\xa9ART', 'Artist', 'ALBUMARTIST', 'TPE2'),
+    'album': ('TALB', 'ALBUM', '\xa9alb', 'Album'),
+    'title': ('TIT2', 'TITLE', '\xa9nam', 'Title'),
+    'composer': ('TCOM', 'COMPOSER', '\xa9wrt', 'Composer'),
+    'year': ('TDRC', 'DATE', '\xa9day', 'Year', 'TYER'),
+}
+
+# 拡張子ごとのタグ名テーブル
+FIELD_TO_TAGS = {
+    '.mp3': _ID3_TAGS,
+    '.aiff': _ID3_TAGS,
+    '.aif': _ID3_TAGS,
+    '.wav': _ID3_TAGS,
+    '.m4a': _MP4_TAGS,
+    '.flac': _VORBIS_TAGS,
+    '.ogg': _VORBIS_TAGS,
+}
+
+
+def _invert_tag_table(tag_table: Dict[str, tuple]) -> Dict[str, Tuple[str, int]]:
+    """タグ名（小文字） -> (項目名, 優先順位) の逆引きテーブルを作成"""
+    return {
+        tag.lower(): (field, priority)
+        for field, tags in tag_table.items()
+        for priority, tag in enumerate(tags)
+    }
+
+
+# ファイルのタグを1回走査するだけで各項目に振り分けるための逆引きテーブル
+_TAG_TO_FIELD = {ext: _invert_tag_table(table) for ext, table in FIELD_TO_TAGS.items()}
+_GENERIC_TAG_TO_FIELD = _invert_tag_table(_GENERIC_TAGS)
+
+# アルバム単位の処理（アートワーク取得など）で必要なアーティスト名・アルバム名のみの逆引きテーブル
+_ALBUM_FIELDS = ('artist', 'album')
+_ALBUM_TAG_TO_FIELD = {
+    ext: {tag: target for tag, target in table.items() if target[0] in _ALBUM_FIELDS}
+    for ext, table in _TAG_TO_FIELD.items()
+}
+_GENERIC_ALBUM_TAG_TO_FIELD = {
+    tag: target for tag, target in _GENERIC_TAG_TO_FIELD.items() if target[0] in _ALBUM_FIELDS
+}
+
+
 class AudioMetadataExtractor:
     """音楽ファイルからメタデータを抽出するクラス"""
     
+    __slots__ = ('supported_formats',)
+    
     def __init__(self):
-        self.supported_formats = ['.mp3', '.aiff', '.aif', '.m4a', '.aac', '.flac', '.ogg', '.wav']
+        self.supported_formats = SUPPORTED_FORMATS
     
     def extract_metadata(self, file_path: str) -> Optional[Dict[str, str]]:
         """
@@ -24,38 +116,37 @@ class AudioMetadataExtractor:
         Returns:
             アルバム名とアーティスト名の辞書、失敗時はNone
         """
+        metadata, _ = self.extract_metadata_with_file(file_path)
+        return metadata
+    
+    def extract_metadata_with_file(self, file_path: str) -> Tuple[Optional[Dict[str, str]], Optional[FileType]]:
+        """
+        音楽ファイルからメタデータを取得し、読み込んだmutagenオブジェクトも返す
+        
+        返したオブジェクトをAudioMetadataWriterに渡すと、書き込み時の再読み込みを省略できる
+        
+        Args:
+            file_path: 音楽ファイルのパス
+        
+        Returns:
+            (メタデータの辞書, mutagenオブジェクト) のタプル、失敗時は (None, None)
+        """
         try:
-            # ファイルの存在確認
-            if not os.path.exists(file_path):
-                print(f"ファイルが見つかりません: {file_path}")
-                return None
-            
-            # ファイル形式の確認
-            file_extension = Path(file_path).suffix.lower()
-            if file_extension not in self.supported_formats:
-                print(f"サポートされていないファイル形式です: {file_extension}")
-                return None
-            
-            # メタデータを読み込み
-            audio_file = File(file_path)
+            audio_file, file_extension = self._load_audio_file(file_path)
             if audio_file is None:
-                print(f"メタデータを読み込めませんでした: {file_path}")
-                return None
+                return None, None
             
-            # アーティスト名を取得（複数のタグから試行）
-            artist = self._get_artist(audio_file)
+            # アーティスト名・アルバム名・曲名・作曲者・年をまとめて取得
+            fields = self._extract_tags(audio_file, _TAG_TO_FIELD.get(file_extension, _GENERIC_TAG_TO_FIELD))
+            artist = fields.get('artist')
+            album = fields.get('album')
+            title = fields.get('title')
+            composer = fields.get('composer')
             
-            # アルバム名を取得
-            album = self._get_album(audio_file)
-            
-            # 曲名を取得
-            title = self._get_title(audio_file)
-            
-            # 作曲者を取得
-            composer = self._get_composer(audio_file)
-            
-            # 年を取得
-            year = self._get_year(audio_file)
+            # 日付形式（YYYY-MM-DD）から年のみを抽出
+            year = fields.get('year')
+            if year and '-' in year:
+                year = year.split('-')[0]
             
             # アートワークの有無を確認
             has_artwork = self._has_artwork(audio_file)
@@ -70,86 +161,123 @@ class AudioMetadataExtractor:
                 'has_artwork': has_artwork
             }
             
-            return result
+            return result, audio_file
             
         except Exception as e:
-            print(f"メタデータ取得エラー: {e}")
-            return None
-    
-    def _get_artist(self, audio_file) -> Optional[str]:
-        """アーティスト名を取得（複数のタグから試行）"""
-        artist_tags = ['TPE1', 'ARTIST', '\xa9ART', 'Artist', 'ALBUMARTIST', 'TPE2', '©ART']
-        
-        for tag in artist_tags:
-            if tag in audio_file:
-                value = audio_file[tag]
-                if isinstance(value, list) and value:
-                    return str(value[0])
-                elif value:
-                    return str(value)
-        return None
+            logger.warning("メタデータ取得エラー: %s", e)
+            return None, None
     
-    def _get_album(self, audio_file) -> Optional[str]:
-        """アルバム名を取得"""
-        album_tags = ['TALB', 'ALBUM', '\xa9alb', 'Album', '©alb']
-        
-        for tag in album_tags:
-            if tag in audio_file:
-                value = audio_file[tag]
-                if isinstance(value, list) and value:
-                    return str(value[0])
-                elif value:
-                    return str(value)
-        return None
-    
-    def _get_title(self, audio_file) -> Optional[str]:
-        """曲名を取得"""
-        title_tags = ['TIT2', 'TITLE', '\xa9nam', 'Title', '©nam']
-        
-        for tag in title_tags:
-            if tag in audio_file:
-                value = audio_file[tag]
-                if isinstance(value, list) and value:
-                    return str(value[0])
-                elif value:
-                    return str(value)
-        return None
+    def extract_album_and_artwork(self, file_path: str) -> Tuple[Optional[Dict[str, Any]], Optional[FileType]]:
+        """
+        音楽ファイルからアーティスト名・アルバム名とアートワークの有無のみを取得
+        
+        曲名・作曲者・年が不要な処理（アートワーク取得など）向けに、必要なタグだけを読み取る
+        
+        Args:
+            file_path: 音楽ファイルのパス
+        
+        Returns:
+            (アーティスト名・アルバム名・アートワーク有無の辞書, mutagenオブジェクト) のタプル、
+            失敗時は (None, None)
+        """
+        try:
+            audio_file, file_extension = self._load_audio_file(file_path)
+            if audio_file is None:
+                return None, None
+            
+            fields = self._extract_tags(audio_file, _ALBUM_TAG_TO_FIELD.get(file_extension, _GENERIC_ALBUM_TAG_TO_FIELD))
+            
+            result = {
+                'artist': fields.get('artist') or 'Unknown Artist',
+                'album': fields.get('album') or 'Unknown Album',
+                'file_path': file_path,
+                'has_artwork': self._has_artwork(audio_file)
+            }
+            
+            return result, audio_file
+            
+        except Exception as e:
+            logger.warning("メタデータ取得エラー: %s", e)
+            return None, None
     
-    def _get_composer(self, audio_file) -> Optional[str]:
-        """作曲者を取得"""
-        composer_tags = ['TCOM', 'COMPOSER', '\xa9wrt', 'Composer', '©wrt']
-        
-        for tag in composer_tags:
-            if tag in audio_file:
-                value = audio_file[tag]
-                if isinstance(value, list) and value:
-                    return str(value[0])
-                elif value:
-                    return str(value)
-        return None
+    def _load_audio_file(self, file_path: str) -> Tuple[Optional[FileType], str]:
+        """
+        音楽ファイルを形式に対応するパーサーで読み込み
+        
+        Args:
+            file_path: 音楽ファイルのパス
+        
+        Returns:
+            (mutagenオブジェクト, 拡張子) のタプル（読み込めない場合、mutagenオブジェクトはNone）
+        """
+        # ファイルの存在確認
+        if not os.path.exists(file_path):
+            logger.warning("ファイルが見つかりません: %s", file_path)
+            return None, ''
+        
+        # ファイル形式の確認
+        file_extension = Path(file_path).suffix.lower()
+        if file_extension not in self.supported_formats:
+            logger.warning("サポートされていないファイル形式です: %s", file_extension)
+            return None, file_extension
+        
+        # 形式に対応するパーサーでメタデータを読み込み
+        parser = _PARSERS.get(file_extension, File)
+        audio_file = parser(file_path)
+        if audio_file is None:
+            logger.warning("メタデータを読み込めませんでした: %s", file_path)
+        
+        return audio_file, file_extension
     
-    def _get_year(self, audio_file) -> Optional[str]:
-        """年を取得"""
-        year_tags = ['TDRC', 'DATE', '\xa9day', 'Year', 'TYER', '©day']
-        
-        for tag in year_tags:
-            if tag in audio_file:
-                value = audio_file[tag]
-                if isinstance(value, list) and value:
-                    year_str = str(value[0])
-                    # 日付形式（YYYY-MM-DD）から年のみを抽出
-                    if '-' in year_str:
-                        return year_str.split('-')[0]
-                    return year_str
-                elif value:
-                    year_str = str(value)
-                    if '-' in year_str:
-                        return year_str.split('-')[0]
-                    return year_str
-        return None
+    def _extract_tags(self, audio_file, tag_to_field: Dict[str, Tuple[str, int]]) -> Dict[str, str]:
+        """
+        ファイルのタグを1回走査して各項目の値を取得
+        
+        同じ項目に複数の候補タグがある場合は、優先順位の高いタグの値を採用する
+        
+        Args:
+            audio_file: mutagenオブジェクト
+            tag_to_field: タグ名（小文字） -> (項目名, 優先順位) の逆引きテーブル
+        
+        Returns:
+            項目名をキーとした値の辞書（見つからない項目は含まない）
+        """
+        values = {}
+        priorities = {}
+        
+        for tag, value in audio_file.items():
+            target = tag_to_field.get(tag.lower())
+            if target is None:
+                continue
+            
+            field, priority = target
+            if field in priorities and priorities[field] <= priority:
+                continue
+            
+            if isinstance(value, list) and value:
+                values[field] = str(value[0])
+            elif value:
+                values[field] = str(value)
+            else:
+                continue
+            priorities[field] = priority
+        
+        return values
     
     def _has_artwork(self, audio_file) -> bool:
         """アートワークが存在するかどうかを確認"""
+        # 形式が分かる場合はアートワークの格納場所を直接確認
+        if isinstance(audio_file, FLAC):
+            return bool(audio_file.pictures)
+        
+        tags = audio_file.tags
+        if tags is None:
+            return False
+        if isinstance(tags, ID3):  # MP3/AIFF/WAV
+            return bool(tags.getall('APIC'))
+        if isinstance(audio_file, MP4):
+            return 'covr' in tags
+        
         # ID3タグ（MP3）のアートワーク
         for tag in audio_file.keys():
             if tag.startswith('APIC'):  # ID3v2のアートワークタグ
@@ -1,60 +1,93 @@
 import os
 from pathlib import Path
 from typing import Optional
-import mimetypes
+from .audio_metadata_extractor import SUPPORTED_FORMATS
+
+
+# アートワーク画像の拡張子 -> MIMEタイプ（mimetypesのデータベース読み込みを省略する）
+_MIME_FROM_EXT = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+}
+
+
+def _keep_padding(info) -> int:
+    """
+    タグ保存時のパディング量を決定
+    
+    既存のパディングに収まる場合は縮小せずにそのまま使い、
+    ファイル全体の書き直し（音声データの移動）を避ける
+    """
+    if info.padding >= 0:
+        return info.padding
+    return info.get_default_padding()
 
 
 class AudioMetadataWriter:
     """音楽ファイルにメタデータを書き込むクラス"""
     
+    __slots__ = ('supported_formats',)
+    
     def __init__(self):
-        self.supported_formats = ['.mp3', '.aiff', '.aif', '.m4a', '.aac', '.flac', '.ogg', '.wav']
+        self.supported_formats = SUPPORTED_FORMATS
     
-    def embed_artwork(self, audio_file_path: str, artwork_file_path: str) -> bool:
+    def embed_artwork(self, audio_file_path: str, artwork_file_path: str, parsed=None) -> bool:
         """
         音楽ファイルにアートワークを埋め込む
         
         Args:
             audio_file_path: 音楽ファイルのパス
             artwork_file_path: アートワーク画像ファイルのパス
+            parsed: 読み込み済みのmutagenオブジェクト（指定時はファイルの再読み込みを省略）
+        
+        Returns:
+            成功したかどうか
+        """
+        # アートワークデータを読み込み
+        # （音楽ファイルが存在しない場合は、埋め込み時のmutagenのエラーとして報告される）
+        try:
+            with open(artwork_file_path, 'rb') as f:
+                artwork_data = f.read()
+        except FileNotFoundError:
+            print(f"アートワークファイルが見つかりません: {artwork_file_path}")
+            return False
+        except OSError as e:
+            print(f"アートワーク埋め込みエラー: {e}")
+            return False
+        
+        # MIMEタイプを取得（不明な拡張子はJPEGとして扱う）
+        mime_type = _MIME_FROM_EXT.get(Path(artwork_file_path).suffix.lower(), 'image/jpeg')
+        
+        return self.embed_artwork_bytes(audio_file_path, artwork_data, mime_type, parsed=parsed)
+    
+    def embed_artwork_bytes(self, audio_file_path: str, artwork_data: bytes, mime_type: str, parsed=None) -> bool:
+        """
+        メモリ上のアートワークデータを音楽ファイルに埋め込む
+        
+        Args:
+            audio_file_path: 音楽ファイルのパス
+            artwork_data: アートワーク画像のデータ
+            mime_type: アートワーク画像のMIMEタイプ
+            parsed: 読み込み済みのmutagenオブジェクト（指定時はファイルの再読み込みを省略）
         
         Returns:
             成功したかどうか
         """
         try:
-            from mutagen import File
-            
-            # ファイルの存在確認
-            if not os.path.exists(audio_file_path):
-                print(f"音楽ファイルが見つかりません: {audio_file_path}")
-                return False
-            
-            if not os.path.exists(artwork_file_path):
-                print(f"アートワークファイルが見つかりません: {artwork_file_path}")
-                return False
-            
             # ファイル形式の確認
             file_extension = Path(audio_file_path).suffix.lower()
             if file_extension not in self.supported_formats:
                 print(f"サポートされていないファイル形式です: {file_extension}")
                 return False
             
-            # アートワークデータを読み込み
-            with open(artwork_file_path, 'rb') as f:
-                artwork_data = f.read()
-            
-            # MIMEタイプを取得
-            mime_type = mimetypes.guess_type(artwork_file_path)[0]
-            if not mime_type:
-                mime_type = 'image/jpeg'  # デフォルト
-            
             # ファイル形式に応じて処理
             if file_extension == '.mp3':
-                return self._embed_to_mp3(audio_file_path, artwork_data, mime_type)
+                return self._embed_to_mp3(audio_file_path, artwork_data, mime_type, parsed)
             elif file_extension in ['.m4a', '.aac', '.mp4']:
-                return self._embed_to_mp4(audio_file_path, artwork_data, mime_type)
+                return self._embed_to_mp4(audio_file_path, artwork_data, mime_type, parsed)
             elif file_extension == '.flac':
-                return self._embed_to_flac(audio_file_path, artwork_data, mime_type)
+                return self._embed_to_flac(audio_file_path, artwork_data, mime_type, parsed)
             else:
                 print(f"アートワーク埋め込み未対応の形式です: {file_extension}")
                 return False
@@ -66,15 +99,22 @@ class AudioMetadataWriter:
             print(f"アートワーク埋め込みエラー: {e}")
             return False
     
-    def _embed_to_mp3(self, audio_file_path: str, artwork_data: bytes, mime_type: str) -> bool:
+    def _embed_to_mp3(self, audio_file_path: str, artwork_data: bytes, mime_type: str, parsed=None) -> bool:
         """MP3ファイルにアートワークを埋め込み"""
         try:
             from mutagen.id3 import ID3, APIC, ID3NoHeaderError
+            from mutagen.mp3 import MP3
             
-            try:
-                audio_file = ID3(audio_file_path)
-            except ID3NoHeaderError:
-                audio_file = ID3()
+            if isinstance(parsed, MP3):
+                # 読み込み済みのタグを再利用
+                if parsed.tags is None:
+                    parsed.add_tags()
+                audio_file = parsed.tags
+            else:
+                try:
+                    audio_file = ID3(audio_file_path)
+                except ID3NoHeaderError:
+                    audio_file = ID3()
             
             # 既存のアートワークを削除
             audio_file.delall('APIC')
@@ -88,19 +128,19 @@ class AudioMetadataWriter:
                 data=artwork_data
             ))
             
-            audio_file.save(audio_file_path)
+            audio_file.save(audio_file_path, padding=_keep_padding)
             return True
             
         except Exception as e:
             print(f"MP3埋め込みエラー: {e}")
             return False
     
-    def _embed_to_mp4(self, audio_file_path: str, artwork_data: bytes, mime_type: str) -> bool:
+    def _embed_to_mp4(self, audio_file_path: str, artwork_data: bytes, mime_type: str, parsed=None) -> bool:
         """M4A/MP4ファイルにアートワークを埋め込み"""
         try:
             from mutagen.mp4 import MP4, MP4Cover
             
-            audio_file = MP4(audio_file_path)
+            audio_file = parsed if isinstance(parsed, MP4) else MP4(audio_file_path)
             
             # カバーフォーマットを決定
             if mime_type == 'image/png':
@@ -111,19 +151,19 @@ class AudioMetadataWriter:
             # アートワークを設定
             audio_file['covr'] = [MP4Cover(artwork_data, cover_format)]
             
-            audio_file.save()
+            audio_file.save(padding=_keep_padding)
             return True
             
         except Exception as e:
             print(f"M4A/MP4埋め込みエラー: {e}")
             return False
     
-    def _embed_to_flac(self, audio_file_path: str, artwork_data: bytes, mime_type: str) -> bool:
+    def _embed_to_flac(self, audio_file_path: str, artwork_data: bytes, mime_type: str, parsed=None) -> bool:
         """FLACファイルにアートワークを埋め込み"""
         try:
             from mutagen.flac import FLAC, Picture
             
-            audio_file = FLAC(audio_file_path)
+            audio_file = parsed if isinstance(parsed, FLAC) else FLAC(audio_file_path)
             
             # 既存のピクチャーを削除
             audio_file.clear_pictures()
@@ -136,7 +176,7 @@ class AudioMetadataWriter:
             picture.data = artwork_data
             
             audio_file.add_picture(picture)
-            audio_file.save()
+            audio_file.save(padding=_keep_padding)
             return True
             
         except Exception as e:
@@ -1,8 +1,20 @@
+import copy
+import functools
 import yaml
 from pathlib import Path
 from typing import Dict, Any
 
 
+@functools.cache
+def _read_config_file(config_file: str, mtime: float) -> Dict[str, Any]:
+    """YAML設定ファイルを読み込み（更新日時が変わらない限り結果を再利用）"""
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+        if config is None:
+            raise ValueError("設定ファイルが空です")
+        return config
+
+
 class Config:
     """YAML設定管理クラス"""
     
@@ -18,11 +30,9 @@ class Config:
             raise FileNotFoundError(f"設定ファイルが必要です: {self.config_file}")
         
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-                if config is None:
-                    raise ValueError("設定ファイルが空です")
-                return config
+            mtime = self.config_file.stat().st_mtime
+            # キャッシュした設定を書き換えないよう、インスタンスごとにコピーを渡す
+            return copy.deepcopy(_read_config_file(str(self.config_file), mtime))
         except (yaml.YAMLError, IOError) as e:
             print(f"設定ファイル読み込みエラー: {e}")
             raise
@@ -40,21 +50,41 @@ class Config:
         except IOError as e:
             print(f"設定ファイル保存エラー: {e}")
     
+    @functools.cached_property
+    def itunes_media_path(self) -> str:
+        """iTunes Media Path"""
+        return self.config["itunes"]["media_path"]
+    
+    @functools.cached_property
+    def artwork_output_dir(self) -> str:
+        """アートワーク出力ディレクトリ"""
+        return self.config["artwork"]["output_dir"]
+    
+    @functools.cached_property
+    def itunes_api_country(self) -> str:
+        """iTunes API国コード"""
+        return self.config["itunes"]["api_country"]
+    
+    @functools.cached_property
+    def artwork_quality(self) -> str:
+        """アートワーク品質"""
+        return self.config["artwork"]["quality"]
+    
     def get_itunes_media_path(self) -> str:
         """iTunes Media Pathを取得"""
-        return self.config["itunes"]["media_path"]
+        return self.itunes_media_path
     
     def get_artwork_output_dir(self) -> str:
         """アートワーク出力ディレクトリを取得"""
-        return self.config["artwork"]["output_dir"]
+        return self.artwork_output_dir
     
     def get_itunes_api_country(self) -> str:
         """iTunes API国コードを取得"""
-        return self.config["itunes"]["api_country"]
+        return self.itunes_api_country
     
     def get_artwork_quality(self) -> str:
         """アートワーク品質を取得"""
-        return self.config["artwork"]["quality"]
+        return self.artwork_quality
     
     def show_config(self) -> None:
         """現在の設定を表示"""
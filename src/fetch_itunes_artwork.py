@@ -1,13 +1,110 @@
+import functools
+import heapq
+import logging
+import shelve
+import shutil
+import threading
+import time
 import requests
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.util.retry import Retry
+
+
+logger = logging.getLogger(__name__)
+
+# リクエストのタイムアウト（接続, 読み込み）秒
+REQUEST_TIMEOUT = (3.05, 15)
+
+# ダウンロード時のファイル書き込み単位（バイト）
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# 画像（圧縮済みのJPEG/PNG）の取得時は転送時の圧縮を要求しない
+IMAGE_REQUEST_HEADERS = {'Accept-Encoding': 'identity'}
+
+# 検索結果キャッシュの最大件数・有効期間（秒）
+SEARCH_CACHE_MAXSIZE = 512
+SEARCH_CACHE_TTL = 600
+
+# 実行をまたいで再利用する検索結果キャッシュのファイル・最大件数・有効期間（秒）
+PERSISTENT_SEARCH_CACHE_FILE = str(Path.home() / ".cache" / "itunes_search")
+PERSISTENT_SEARCH_CACHE_MAXSIZE = 2048
+PERSISTENT_SEARCH_CACHE_TTL = 86400
+# キャッシュファイル内で保存日時の一覧（キー -> 保存日時、保存順）を保持するキー
+_SEARCH_CACHE_INDEX_KEY = '__index__'
+
+
+@functools.lru_cache(maxsize=1024)
+def _artwork_url_variants(artwork_base: str) -> Dict[str, str]:
+    """
+    100x100のアートワークURLから各解像度のURLを生成（同じURLの結果はキャッシュ）
+    
+    URL中のサイズ指定（100x100bb）の位置を1回だけ探し、前後を連結して各URLを作る
+    """
+    head, size, tail = artwork_base.partition('100x100bb')
+    if not size:
+        # サイズ指定を含まないURLはそのまま使用
+        return {
+            'small': artwork_base,
+            'medium': artwork_base,
+            'large': artwork_base,
+            'original': artwork_base,
+            'no_border': artwork_base
+        }
+    
+    return {
+        'small': artwork_base,  # 100x100
+        'medium': f"{head}600x600bb{tail}",  # 600x600
+        'large': f"{head}1200x1200bb{tail}",  # 1200x1200
+        'original': f"{head}3000x3000bb{tail}",  # 最高解像度
+        # ボーダーなし
+        'no_border': f"{head}600x600{tail[2:]}" if tail.startswith('-c') else artwork_base
+    }
+
 
 class iTunesArtworkFetcher:
     """iTunes Search APIを使用してアートワークを取得するクラス"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None,
+                 search_cache_file: Optional[str] = PERSISTENT_SEARCH_CACHE_FILE):
+        """
+        Args:
+            session: 使用するセッション（省略時は接続プールを設定したセッションを作成）
+            search_cache_file: 検索結果を保存するキャッシュファイル（Noneの場合はファイルに保存しない）
+        """
         self.base_url = "https://itunes.apple.com/search"
         self.lookup_url = "https://itunes.apple.com/lookup"
+        
+        # API・アートワーク取得で接続を再利用するセッション
+        self._owns_session = session is None
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+            )
+            session.mount('https://', adapter)
+        self.session = session
+        
+        # 検索結果のキャッシュ（(クエリ, 国コード, 件数) -> (取得時刻, 検索結果)）
+        self._search_cache: Dict[Tuple[str, str, int], Tuple[float, List[Dict]]] = {}
+        self._search_cache_lock = threading.Lock()
+        self._search_cache_file = search_cache_file
+        self._search_cache_file_lock = threading.Lock()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self) -> None:
+        """このクラスで作成したセッションを閉じる"""
+        if self._owns_session:
+            self.session.close()
     
     def search_music(self, query: str, country: str = "jp", limit: int = 10) -> List[Dict]:
         """
@@ -19,8 +116,22 @@ class iTunesArtworkFetcher:
             limit: 検索結果の上限数
         
         Returns:
-            検索結果のリスト
+            検索結果のリスト（キャッシュと共有するため変更しないこと）
         """
+        # 有効期間内の同じ検索はキャッシュから返す
+        key = (query, country, limit)
+        with self._search_cache_lock:
+            cached = self._search_cache.get(key)
+            if cached and time.monotonic() - cached[0] < SEARCH_CACHE_TTL:
+                return cached[1]
+        
+        # 前回までの実行で保存した検索結果を確認（ファイルの読み込みは_search_cache_lockの外で行う）
+        results = self._load_persistent_search(key)
+        if results is not None:
+            with self._search_cache_lock:
+                self._remember_search(key, results)
+            return results
+        
         params = {
             'term': query,
             'country': country,
@@ -30,13 +141,88 @@ class iTunesArtworkFetcher:
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
+            response = self.session.get(self.base_url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             data = response.json()
-            return data.get('results', [])
+            results = data.get('results', [])
         except requests.RequestException as e:
-            print(f"検索エラー: {e}")
+            logger.warning("検索エラー: %s", e)
             return []
+        
+        with self._search_cache_lock:
+            self._remember_search(key, results)
+        # 一時的に空の結果が返った場合に次回以降の検索を妨げないよう、空の結果はファイルに保存しない
+        if results:
+            self._store_persistent_search(key, results)
+        
+        return results
+    
+    def _remember_search(self, key: Tuple[str, str, int], results: List[Dict]) -> None:
+        """検索結果をメモリ上のキャッシュに登録（_search_cache_lockを保持して呼び出す）"""
+        # 上限を超える場合は最も古いエントリを削除
+        self._search_cache.pop(key, None)
+        if len(self._search_cache) >= SEARCH_CACHE_MAXSIZE:
+            del self._search_cache[next(iter(self._search_cache))]
+        self._search_cache[key] = (time.monotonic(), results)
+    
+    def _load_persistent_search(self, key: Tuple[str, str, int]) -> Optional[List[Dict]]:
+        """
+        キャッシュファイルから有効期間内の検索結果を取得
+        
+        Returns:
+            検索結果（保存されていない・期限切れの場合はNone）
+        """
+        if not self._search_cache_file:
+            return None
+        
+        try:
+            with self._search_cache_file_lock, shelve.open(self._search_cache_file, flag='r') as cache:
+                cached = cache.get(repr(key))
+        except Exception:
+            # キャッシュファイルがまだない・読み込めない場合は検索する
+            return None
+        
+        if cached and time.time() - cached[0] < PERSISTENT_SEARCH_CACHE_TTL:
+            return cached[1]
+        return None
+    
+    def _store_persistent_search(self, key: Tuple[str, str, int], results: List[Dict]) -> None:
+        """
+        検索結果をキャッシュファイルに保存
+        
+        保存日時の一覧を保存順に保持し、期限切れのエントリと上限を超えた古いエントリを削除する
+        （保存済みの検索結果は読み込まない）
+        """
+        if not self._search_cache_file:
+            return
+        
+        try:
+            Path(self._search_cache_file).parent.mkdir(parents=True, exist_ok=True)
+            with self._search_cache_file_lock, shelve.open(self._search_cache_file) as cache:
+                index = cache.get(_SEARCH_CACHE_INDEX_KEY)
+                if index is None:
+                    # 保存日時の一覧がない古いキャッシュファイルは、既存のエントリを期限切れとして扱う
+                    index = dict.fromkeys((k for k in cache.keys() if k != _SEARCH_CACHE_INDEX_KEY), 0.0)
+                
+                now = time.time()
+                cache_key = repr(key)
+                index.pop(cache_key, None)
+                index[cache_key] = now
+                cache[cache_key] = (now, results)
+                
+                # 古い順に、期限切れまたは上限を超えたエントリを削除
+                while index:
+                    oldest_key = next(iter(index))
+                    if (len(index) <= PERSISTENT_SEARCH_CACHE_MAXSIZE
+                            and now - index[oldest_key] < PERSISTENT_SEARCH_CACHE_TTL):
+                        break
+                    del index[oldest_key]
+                    if oldest_key in cache:
+                        del cache[oldest_key]
+                
+                cache[_SEARCH_CACHE_INDEX_KEY] = index
+        except Exception as e:
+            logger.warning("検索キャッシュ保存エラー: %s", e)
     
     def get_artwork_urls(self, result: Dict) -> Dict[str, str]:
         """
@@ -52,16 +238,8 @@ class iTunesArtworkFetcher:
         if not artwork_base:
             return {}
         
-        # 各解像度のURLを生成
-        urls = {
-            'small': artwork_base,  # 100x100
-            'medium': artwork_base.replace('100x100bb', '600x600bb'),  # 600x600
-            'large': artwork_base.replace('100x100bb', '1200x1200bb'),  # 1200x1200
-            'original': artwork_base.replace('100x100bb', '3000x3000bb'),  # 最高解像度
-            'no_border': artwork_base.replace('100x100bb-c', '600x600')  # ボーダーなし
-        }
-        
-        return urls
+        # 各解像度のURLを生成（キャッシュを共有するため複製して返す）
+        return dict(_artwork_url_variants(artwork_base))
     
     def download_artwork(self, url: str, filename: str) -> bool:
         """
@@ -75,70 +253,119 @@ class iTunesArtworkFetcher:
             成功したかどうか
         """
         try:
-            response = requests.get(url, stream=True)
+            with self.session.get(url, headers=IMAGE_REQUEST_HEADERS, stream=True, timeout=REQUEST_TIMEOUT) as response:
+                response.raise_for_status()
+                
+                # レスポンスをそのままファイルにコピー（サーバーが圧縮して返した場合は展開）
+                response.raw.decode_content = True
+                with open(filename, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+            
+            logger.info("ダウンロード完了: %s", filename)
+            return True
+        except (requests.RequestException, Urllib3HTTPError) as e:
+            logger.warning("ダウンロードエラー: %s", e)
+            return False
+    
+    def fetch_artwork(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """
+        アートワークをメモリ上に取得（ファイルには保存しない）
+        
+        Args:
+            url: ダウンロードするURL
+        
+        Returns:
+            (画像データ, MIMEタイプ) のタプル（失敗時はNone）
+        """
+        try:
+            response = self.session.get(url, headers=IMAGE_REQUEST_HEADERS, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             
-            with open(filename, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            mime_type = response.headers.get('Content-Type', '').split(';', 1)[0].strip()
+            if not mime_type.startswith('image/'):
+                mime_type = 'image/jpeg'  # デフォルト
             
-            print(f"ダウンロード完了: {filename}")
-            return True
+            return response.content, mime_type
         except requests.RequestException as e:
-            print(f"ダウンロードエラー: {e}")
-            return False
+            logger.warning("ダウンロードエラー: %s", e)
+            return None
     
-    def search_and_download(self, query: str, output_dir: str = "artwork", 
-                          quality: str = "large", country: str = "jp", target_artist: str = None, target_album: str = None):
+    def search_artwork(self, query: str, quality: str = "large", country: str = "jp",
+                       target_artist: str = None, target_album: str = None) -> Optional[Dict]:
         """
-        検索してアートワークをダウンロード
+        検索して最適な結果のアートワーク情報を取得（ダウンロードはしない）
         
         Args:
             query: 検索クエリ
-            output_dir: 出力ディレクトリ
             quality: 画質（small, medium, large, original）
             country: 国コード
             target_artist: 対象アーティスト名（優先選択用）
             target_album: 対象アルバム名（優先選択用）
+        
+        Returns:
+            アートワーク情報（見つからない場合はNone）
         """
         results = self.search_music(query, country)
         
         if not results:
-            print("検索結果が見つかりませんでした")
-            return
-        
-        # 出力ディレクトリを作成
-        Path(output_dir).mkdir(exist_ok=True)
+            logger.warning("検索結果が見つかりませんでした")
+            return None
         
         # 最適な結果を選択
         best_result = self._select_best_match(results, target_artist, target_album)
         
-        if best_result:
-            artist = best_result.get('artistName', 'Unknown')
-            album = best_result.get('collectionName', 'Unknown')
-            
-            print(f"\n選択された結果: {artist} - {album}")
+        if not best_result:
+            return None
+        
+        artist = best_result.get('artistName', 'Unknown')
+        album = best_result.get('collectionName', 'Unknown')
+        
+        logger.info("選択された結果: %s - %s", artist, album)
+        
+        # アートワークURLを取得
+        artwork_urls = self.get_artwork_urls(best_result)
+        
+        if quality not in artwork_urls:
+            return None
+        
+        return {
+            'artist': artist,
+            'album': album,
+            'artwork_url': artwork_urls[quality],
+            'itunes_id': best_result.get('collectionId'),
+            'release_date': best_result.get('releaseDate')
+        }
+    
+    def search_and_download(self, query: str, output_dir: str = "artwork", 
+                          quality: str = "large", country: str = "jp", target_artist: str = None, target_album: str = None):
+        """
+        検索してアートワークをダウンロード
+        
+        Args:
+            query: 検索クエリ
+            output_dir: 出力ディレクトリ
+            quality: 画質（small, medium, large, original）
+            country: 国コード
+            target_artist: 対象アーティスト名（優先選択用）
+            target_album: 対象アルバム名（優先選択用）
+        """
+        artwork_info = self.search_artwork(query, quality, country, target_artist, target_album)
+        
+        if artwork_info:
+            # 出力ディレクトリを作成
+            Path(output_dir).mkdir(exist_ok=True)
             
-            # アートワークURLを取得
-            artwork_urls = self.get_artwork_urls(best_result)
+            filename = self._artwork_filename(output_dir, artwork_info)
             
-            if quality in artwork_urls:
-                url = artwork_urls[quality]
-                # ファイル名を安全な形式に変換
-                safe_filename = f"{artist} - {album}".replace('/', '_').replace('\\', '_')
-                filename = f"{output_dir}/{safe_filename}.jpg"
-                
-                if self.download_artwork(url, filename):
-                    print(f"保存先: {filename}")
-                    # アートワーク情報を返却
-                    yield {
-                        'artist': artist,
-                        'album': album,
-                        'artwork_url': url,
-                        'filename': filename,
-                        'itunes_id': best_result.get('collectionId'),
-                        'release_date': best_result.get('releaseDate')
-                    }
+            if self.download_artwork(artwork_info['artwork_url'], filename):
+                logger.info("保存先: %s", filename)
+                # アートワーク情報を返却
+                yield {**artwork_info, 'filename': filename}
+    
+    def _artwork_filename(self, output_dir: str, artwork_info: Dict) -> str:
+        """アートワーク情報から保存ファイル名を生成（安全な形式に変換）"""
+        safe_filename = f"{artwork_info['artist']} - {artwork_info['album']}".replace('/', '_').replace('\\', '_')
+        return f"{output_dir}/{safe_filename}.jpg"
     
     def _select_best_match(self, results: List[Dict], target_artist: str = None, target_album: str = None) -> Optional[Dict]:
         """
@@ -159,6 +386,21 @@ class iTunesArtworkFetcher:
         if not target_artist and not target_album:
             return results[0]
         
+        # 対象のアーティスト名・アルバム名は結果ごとに変わらないため事前に正規化
+        target_artist_lower = target_artist.lower() if target_artist else None
+        target_album_lower = target_album.lower() if target_album else None
+        
+        # アーティスト名・アルバム名の両方が完全一致する結果があれば、スコア計算をせずにそれを返す
+        # （完全一致は両方の項目で最高スコアとなるため、選択結果は変わらない）
+        if target_artist_lower and target_album_lower:
+            for result in results:
+                if (result.get('artistName', '').lower() == target_artist_lower
+                        and result.get('collectionName', '').lower() == target_album_lower):
+                    return result
+        
+        target_artist_words = frozenset(target_artist_lower.split()) if target_artist_lower else frozenset()
+        target_album_words = frozenset(target_album_lower.split()) if target_album_lower else frozenset()
+        
         # スコアリング用の関数
         def calculate_score(result):
             score = 0
@@ -166,46 +408,36 @@ class iTunesArtworkFetcher:
             result_album = result.get('collectionName', '').lower()
             
             # アーティスト名の一致度をチェック
-            if target_artist:
-                target_artist_lower = target_artist.lower()
+            if target_artist_lower:
                 if target_artist_lower == result_artist:
                     score += 100  # 完全一致
                 elif target_artist_lower in result_artist or result_artist in target_artist_lower:
                     score += 50   # 部分一致
                 
                 # 単語レベルでの一致をチェック
-                target_words = set(target_artist_lower.split())
-                result_words = set(result_artist.split())
-                common_words = target_words.intersection(result_words)
+                common_words = target_artist_words.intersection(result_artist.split())
                 score += len(common_words) * 10
             
             # アルバム名の一致度をチェック
-            if target_album:
-                target_album_lower = target_album.lower()
+            if target_album_lower:
                 if target_album_lower == result_album:
                     score += 100  # 完全一致
                 elif target_album_lower in result_album or result_album in target_album_lower:
                     score += 50   # 部分一致
                 
                 # 単語レベルでの一致をチェック
-                target_words = set(target_album_lower.split())
-                result_words = set(result_album.split())
-                common_words = target_words.intersection(result_words)
+                common_words = target_album_words.intersection(result_album.split())
                 score += len(common_words) * 10
             
             return score
         
-        # 各結果にスコアを付けてソート
-        scored_results = [(result, calculate_score(result)) for result in results]
-        scored_results.sort(key=lambda x: x[1], reverse=True)
-        
-        # デバッグ情報を表示
-        if len(scored_results) > 1:
-            print(f"検索結果の優先順位:")
-            for i, (result, score) in enumerate(scored_results[:3], 1):
+        # デバッグ情報を表示（上位3件のみスコア順に並べる）
+        if len(results) > 1 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("検索結果の優先順位:")
+            for i, result in enumerate(heapq.nlargest(3, results, key=calculate_score), 1):
                 artist = result.get('artistName', 'Unknown')
                 album = result.get('collectionName', 'Unknown')
-                print(f"  {i}. {artist} - {album} (スコア: {score})")
+                logger.debug("  %d. %s - %s (スコア: %s)", i, artist, album, calculate_score(result))
         
-        # 最高スコアの結果を返す
-        return scored_results[0][0]
+        # 最高スコアの結果を返す（同点の場合は検索結果の順位が高いもの）
+        return max(results, key=calculate_score)
@@ -1,8 +1,13 @@
+import logging
+import os
 from pathlib import Path
 from typing import List, Dict, Optional
 from .config import config
 
 
+logger = logging.getLogger(__name__)
+
+
 class iTunesAlbumFinder:
     """iTunes Mediaディレクトリからアルバムを検索するクラス"""
     
@@ -13,33 +18,73 @@ class iTunesAlbumFinder:
         
         self.itunes_media_path = Path(itunes_media_path)
         self.supported_formats = ['.mp3', '.aiff', '.aif', '.m4a', '.aac', '.flac', '.ogg', '.wav']
+        self._ext_set = frozenset(self.supported_formats)  # 拡張子判定用
         
         # 設定ファイルのパス検証
         if not config.validate_itunes_path():
-            print(f"設定されたiTunes Media Path: {self.itunes_media_path}")
-            print("config.yamlファイルでパスを変更できます")
+            logger.warning("設定されたiTunes Media Path: %s", self.itunes_media_path)
+            logger.warning("config.yamlファイルでパスを変更できます")
     
-    def find_albums_by_name(self, album_name: str, case_sensitive: bool = False) -> List[Dict[str, any]]:
+    def find_albums_by_name(self, album_name: str, case_sensitive: bool = False,
+                            artist_name: Optional[str] = None) -> List[Dict[str, any]]:
         """
         アルバム名でディレクトリを検索し、該当するアルバムの情報を返す
         
         Args:
             album_name: 検索するアルバム名
             case_sensitive: 大文字小文字を区別するか
+            artist_name: アーティスト名（指定すると名前が一致するアーティストのディレクトリのみを検索）
         
         Returns:
             マッチしたアルバムの情報リスト
         """
+        return self.find_albums_by_names([album_name], case_sensitive, artist_name)[album_name]
+    
+    def find_albums_by_names(self, album_names: List[str], case_sensitive: bool = False,
+                             artist_name: Optional[str] = None) -> Dict[str, List[Dict[str, any]]]:
+        """
+        複数のアルバム名でディレクトリを一度に検索
+        
+        ディレクトリの走査は1回だけ行い、各アルバムディレクトリ名を全ての検索語と照合する
+        
+        Args:
+            album_names: 検索するアルバム名のリスト
+            case_sensitive: 大文字小文字を区別するか
+            artist_name: アーティスト名（指定すると名前が一致するアーティストのディレクトリのみを検索）
+        
+        Returns:
+            検索したアルバム名をキーとした、マッチしたアルバムの情報リストの辞書
+        """
+        results = {album_name: [] for album_name in album_names}
+        if not album_names:
+            return results
+        
+        # 空文字やパス区切りを含む名前ではiTunes Media直下以外を走査してしまうため受け付けない
+        if artist_name is not None and (
+            artist_name in ('', '.', '..') or os.sep in artist_name or (os.altsep and os.altsep in artist_name)
+        ):
+            logger.warning("無効なアーティスト名です: '%s'", artist_name)
+            return results
+        
         if not self.itunes_media_path.exists():
-            print(f"iTunes Mediaディレクトリが見つかりません: {self.itunes_media_path}")
-            return []
+            logger.warning("iTunes Mediaディレクトリが見つかりません: %s", self.itunes_media_path)
+            return results
         
-        results = []
-        search_pattern = album_name if case_sensitive else album_name.lower()
+        search_patterns = [
+            (album_name, album_name if case_sensitive else album_name.lower())
+            for album_name in results
+        ]
+        
+        # アーティスト名が指定されている場合は名前が一致するディレクトリのみアルバムを走査
+        # （結果のアーティスト名には引数ではなく実際のディレクトリ名を使う）
+        if artist_name is not None:
+            artist_dirs = (entry for entry in self.itunes_media_path.iterdir() if entry.name == artist_name)
+        else:
+            artist_dirs = self.itunes_media_path.iterdir()
         
         try:
             # アーティストディレクトリを走査
-            for artist_dir in self.itunes_media_path.iterdir():
+            for artist_dir in artist_dirs:
                 if not artist_dir.is_dir():
                     continue
                 
@@ -48,25 +93,33 @@ class iTunesAlbumFinder:
                     if not album_dir.is_dir():
                         continue
                     
+                    # アルバム名の部分一致をチェック（ディレクトリ名の変換は1回だけ行う）
                     album_dir_name = album_dir.name if case_sensitive else album_dir.name.lower()
+                    matched_names = [album_name for album_name, search_pattern in search_patterns
+                                     if search_pattern in album_dir_name]
+                    if not matched_names:
+                        continue
+                    
+                    audio_files = self._get_audio_files(album_dir)
+                    if not audio_files:  # オーディオファイルが含まれている場合のみ追加
+                        continue
                     
-                    # アルバム名の部分一致をチェック
-                    if search_pattern in album_dir_name:
-                        audio_files = self._get_audio_files(album_dir)
-                        if audio_files:  # オーディオファイルが含まれている場合のみ追加
-                            album_info = {
-                                'artist_name': artist_dir.name,
-                                'album_name': album_dir.name,
-                                'album_path': str(album_dir),
-                                'audio_files': audio_files,
-                                'audio_file_count': len(audio_files)
-                            }
-                            results.append(album_info)
+                    album_info = {
+                        'artist_name': artist_dir.name,
+                        'album_name': album_dir.name,
+                        'album_path': str(album_dir),
+                        'audio_files': audio_files,
+                        'audio_file_count': len(audio_files)
+                    }
+                    
+                    # 部分一致した全ての検索語の結果に追加
+                    for album_name in matched_names:
+                        results[album_name].append(album_info)
                             
         except PermissionError as e:
-            print(f"ディレクトリアクセス権限エラー: {e}")
+            logger.warning("ディレクトリアクセス権限エラー: %s", e)
         except Exception as e:
-            print(f"検索エラー: {e}")
+            logger.warning("検索エラー: %s", e)
         
         return results
     
@@ -81,7 +134,7 @@ class iTunesAlbumFinder:
         Returns:
             マッチしたアルバムの情報、見つからない場合はNone
         """
-        results = self.find_albums_by_name(album_name, case_sensitive=True)
+        results = self.find_albums_by_name(album_name, case_sensitive=True, artist_name=artist_name)
         
         for result in results:
             if result['album_name'] == album_name:
@@ -90,12 +143,16 @@ class iTunesAlbumFinder:
         
         return None
     
-    def _get_audio_files(self, directory: Path) -> List[str]:
+    def _get_audio_files(self, directory: Path, recursive: bool = False) -> List[str]:
         """
         ディレクトリ内のオーディオファイルを取得
         
+        iTunes Mediaのアルバムディレクトリはサブディレクトリを持たないため、
+        既定ではディレクトリ直下のみを走査する
+        
         Args:
             directory: 検索対象のディレクトリ
+            recursive: サブディレクトリも走査するか
         
         Returns:
             オーディオファイルのパスリスト
@@ -103,15 +160,25 @@ class iTunesAlbumFinder:
         audio_files = []
         
         try:
-            for file_path in directory.rglob('*'):
-                if file_path.is_file() and file_path.suffix.lower() in self.supported_formats:
-                    audio_files.append(str(file_path))
+            # os.scandirで走査（DirEntryの種別情報を使い、Pathの生成とstatを省略）
+            # ディレクトリのシンボリックリンクはたどらない
+            pending_dirs = [str(directory)]
+            while pending_dirs:
+                with os.scandir(pending_dirs.pop()) as entries:
+                    for entry in entries:
+                        # 拡張子の判定（システムコール不要）を先に行い、対象の拡張子のみファイルか確認
+                        name = entry.name
+                        dot = name.rfind('.')
+                        if dot >= 0 and name[dot:].lower() in self._ext_set and entry.is_file():
+                            audio_files.append(entry.path)
+                        elif recursive and entry.is_dir(follow_symlinks=False):
+                            pending_dirs.append(entry.path)
             
-            # ファイル名でソート
-            audio_files.sort()
+            # ファイル名（大文字小文字を区別しない）でソート（サブディレクトリ走査時はディレクトリごと）
+            audio_files.sort(key=lambda path: (os.path.dirname(path), os.path.basename(path).casefold()))
             
         except Exception as e:
-            print(f"ファイル検索エラー in {directory}: {e}")
+            logger.warning("ファイル検索エラー in %s: %s", directory, e)
         
         return audio_files
     
@@ -125,29 +192,27 @@ class iTunesAlbumFinder:
         Returns:
             検索結果のリスト
         """
-        print(f"アルバム名 '{album_name}' を検索中...")
-        print("-" * 60)
+        logger.info("アルバム名 '%s' を検索中...\n%s", album_name, "-" * 60)
         
         results = self.find_albums_by_name(album_name)
         
         if not results:
-            print("該当するアルバムが見つかりませんでした。")
+            logger.info("該当するアルバムが見つかりませんでした。")
             return []
         
-        print(f"{len(results)}件のアルバムが見つかりました:\n")
-        
-        for i, album_info in enumerate(results, 1):
-            print(f"{i}. アーティスト: {album_info['artist_name']}")
-            print(f"   アルバム: {album_info['album_name']}")
-            print(f"   パス: {album_info['album_path']}")
-            print(f"   楽曲数: {album_info['audio_file_count']}曲")
-            print(f"   楽曲ファイル:")
-            
-            for j, audio_file in enumerate(album_info['audio_files'], 1):
-                file_name = Path(audio_file).name
-                print(f"     {j:2d}. {file_name}")
-            
-            print()
+        # 一覧はまとめて組み立ててから1回で出力
+        if logger.isEnabledFor(logging.INFO):
+            lines = [f"{len(results)}件のアルバムが見つかりました:\n"]
+            for i, album_info in enumerate(results, 1):
+                lines.append(f"{i}. アーティスト: {album_info['artist_name']}")
+                lines.append(f"   アルバム: {album_info['album_name']}")
+                lines.append(f"   パス: {album_info['album_path']}")
+                lines.append(f"   楽曲数: {album_info['audio_file_count']}曲")
+                lines.append("   楽曲ファイル:")
+                lines.extend(f"     {j:2d}. {os.path.basename(audio_file)}"
+                             for j, audio_file in enumerate(album_info['audio_files'], 1))
+                lines.append("")
+            logger.info("\n".join(lines))
         
         return results
     
@@ -162,14 +227,14 @@ class iTunesAlbumFinder:
             アーティストのアルバム一覧
         """
         if not self.itunes_media_path.exists():
-            print(f"iTunes Mediaディレクトリが見つかりません: {self.itunes_media_path}")
+            logger.warning("iTunes Mediaディレクトリが見つかりません: %s", self.itunes_media_path)
             return []
         
         results = []
         artist_path = self.itunes_media_path / artist_name
         
         if not artist_path.exists() or not artist_path.is_dir():
-            print(f"アーティストディレクトリが見つかりません: {artist_path}")
+            logger.warning("アーティストディレクトリが見つかりません: %s", artist_path)
             return []
         
         try:
@@ -187,13 +252,15 @@ class iTunesAlbumFinder:
                         results.append(album_info)
         
         except Exception as e:
-            print(f"アーティスト検索エラー: {e}")
+            logger.warning("アーティスト検索エラー: %s", e)
         
         return results
 
 
 # 使用例
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     finder = iTunesAlbumFinder()
     
     # アルバム名を入力
@@ -203,6 +270,6 @@ if __name__ == "__main__":
         results = finder.search_and_display(album_name)
         
         if results:
-            print(f"\n検索完了: {len(results)}件のアルバムが見つかりました")
+            logger.info("\n検索完了: %s件のアルバムが見つかりました", len(results))
         else:
-            print("\n該当するアルバムはありませんでした")
+            logger.info("\n該当するアルバムはありませんでした")
@@ -1,14 +1,138 @@
+import functools
+import logging
+import re
 import requests
+import shelve
 from bs4 import BeautifulSoup
+import threading
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Optional, Tuple
 from urllib.parse import quote
+from urllib3.util.retry import Retry
+
+# HTMLパーサー（lxmlがインストールされていれば高速なlxmlを使用）
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    _HTML_PARSER = 'html.parser'
+
+
+logger = logging.getLogger(__name__)
+
+# tower.jpのページの文字コード（指定してBeautifulSoupの文字コード推定を省略する）
+PAGE_ENCODING = 'utf-8'
+
+# リクエストのレート制限（トークンバケット: 1秒あたりのリクエスト数・連続で送れる数）と同時実行数の上限
+REQUEST_RATE = 1.0
+REQUEST_BURST = 4
+MAX_CONCURRENT_REQUESTS = 16
+
+# 429/503応答時の再試行回数と、Retry-Afterがない場合の待機時間（秒、再試行ごとに倍増）
+THROTTLE_RETRIES = 3
+THROTTLE_BACKOFF = 2.0
+
+# 検索結果として扱う商品の最大件数
+MAX_SEARCH_RESULTS = 10
+
+# 検索結果のメモリ上のキャッシュの最大件数
+SEARCH_CACHE_MAXSIZE = 256
+
+# 実行をまたいで再利用する商品詳細ページのキャッシュのファイル・最大件数・有効期間（秒）
+DETAIL_CACHE_FILE = str(Path.home() / ".cache" / "tower_detail")
+DETAIL_CACHE_MAXSIZE = 1024
+DETAIL_CACHE_TTL = 7 * 86400
+# キャッシュファイル内で保存日時の一覧（URL -> 保存日時、保存順）を保持するキー
+_DETAIL_CACHE_INDEX_KEY = '__index__'
+
+# 解析済みの商品詳細ページ（HTMLと楽曲情報）をメモリ上に保持する件数
+PARSED_DETAIL_CACHE_MAXSIZE = 32
+
+# 商品IDの抽出パターン（商品ページのパスとカートボタンのonclick）
+_ITEM_ID_RE = re.compile(r'/item/(\d+)')
+_CART_ID_RE = re.compile(r'cartinsearchresult\((\d+)\)')
+
+
+@functools.lru_cache(maxsize=1024)
+def _encode_query(query: str) -> str:
+    """
+    検索クエリを前処理してURLのパス用にエンコード（同じクエリの結果はキャッシュ）
+    
+    半角の&は検索で区切りとして扱われるため全角の＆に変換する
+    """
+    return quote(query.replace('&', '＆'), safe='')
 
 
 class TowerRecordsScraper:
     """Tower RecordsのWebサイトから作曲者情報を取得するクラス"""
     
-    def __init__(self):
+    # 検索結果の商品要素のセレクタ（先頭から順に試行）
+    _PRODUCT_ITEM_SELECTORS = (
+        '.TOL-item-search-result-PC-result-tile-display-item',  # 正しい商品アイテム
+        '.tr-item-block',
+        '.item-block',
+        '.search-result-item',
+        '[class*="item"]',
+        '[class*="product"]',
+        '.item',
+        '.product'
+    )
+    
+    # 検索結果の各項目に使うTower Records特有のセレクタ（通常はこれだけで取得できる）
+    _TITLE_SEL = '.tr-item-block-info-item-name a'
+    _ARTIST_SEL = '.tr-item-block-info-artist-name p a'
+    _PRICE_SEL = '.tr-item-block-info-price span'
+    _LABEL_SEL = '.tr-item-block-info-label'
+    
+    # 特有のセレクタで取得できない場合に試行する汎用セレクタ
+    _TITLE_SELECTORS = (
+        '.tr-item-block-info-title',
+        '.item-title',
+        '.product-title',
+        '.title',
+        'h3', 'h4', 'h5',
+        '[class*="title"]',
+        'a'
+    )
+    _ARTIST_SELECTORS = (
+        '.tr-item-block-info-artist-name',
+        '.artist-name',
+        '.artist',
+        '.performer',
+        '[class*="artist"]'
+    )
+    _PRICE_SELECTORS = (
+        '.tr-item-block-info-price',
+        '.price',
+        '.cost',
+        '[class*="price"]'
+    )
+    _LABEL_SELECTORS = (
+        '.label',
+        '.publisher',
+        '[class*="label"]'
+    )
+    
+    # 商品詳細ページの収録内容のセレクタ
+    _TRACK_ITEM_SEL = '.TOL-item-info-PC-tab-recorded-contents-list-track-item'
+    _TRACK_NUMBER_SEL = '.TOL-item-info-PC-tab-recorded-contents-list-track-number span'
+    _TRACK_TITLE_SEL = '.TOL-item-info-PC-tab-recorded-contents-list-track-title'
+    _TRACK_LENGTH_SEL = '.TOL-item-info-PC-tab-recorded-contents-list-track-length'
+    _TRACK_HIDDEN_AREA_SEL = '.TOL-item-info-PC-tab-recorded-contents-list-track-hidden-area'
+    _TRACK_CREDIT_DIV_SEL = '.TOL-item-info-PC-tab-recorded-contents-list-track-hidden-paragraph div'
+    
+    # デバッグ用：結果数表示のセレクタと、よく使われるクラス名
+    _RESULT_COUNT_SELECTORS = ('.result-count', '.search-count', '[class*="count"]')
+    _COMMON_CLASSES = ('item', 'product', 'result', 'card', 'block', 'box')
+    
+    def __init__(self, detail_cache_file: Optional[str] = DETAIL_CACHE_FILE):
+        """
+        Args:
+            detail_cache_file: 商品詳細ページを保存するキャッシュファイル（Noneの場合はファイルに保存しない）
+        """
         self.base_url = "https://tower.jp"
         self.search_url = "https://tower.jp/search/item"
         
@@ -25,6 +149,120 @@ class TowerRecordsScraper:
         # セッション管理
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # 並列取得時も接続を再利用できるよう接続プールを拡張し、一時的なサーバーエラーは再試行する
+        # 429/503応答はアダプターで再試行せず、_fetchのレート制限で処理する
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 504),
+                              allowed_methods=frozenset(['GET']),
+                              respect_retry_after_header=False)
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # レート制限（トークンバケットでリクエストの開始を制限し、同時実行数も制限する）
+        # 429/503応答を受けた場合は一時的にレートを下げる
+        self._rate_lock = threading.Lock()
+        self._rate = REQUEST_RATE
+        self._tokens = float(REQUEST_BURST)
+        self._tokens_updated_at = time.monotonic()
+        self._request_slots = threading.Semaphore(MAX_CONCURRENT_REQUESTS)
+        
+        # 検索結果のキャッシュ（正規化したクエリ -> 検索結果）と商品詳細ページのキャッシュ
+        self._search_cache: Dict[str, List[Dict[str, str]]] = {}
+        self._detail_cache_file = detail_cache_file
+        self._detail_cache_file_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        # 解析済みの商品詳細ページ（URL -> (HTML, 楽曲情報)）
+        self._parsed_detail_cache: Dict[str, Tuple[str, List[Dict[str, any]]]] = {}
+        # 取得中の商品詳細ページ（同じURLの同時取得は1回の通信を共有する）
+        self._detail_in_flight: Dict[str, Future] = {}
+    
+    def _fetch(self, url: str) -> requests.Response:
+        """
+        レート制限を守ってページを取得
+        
+        トークンが残っていればすぐに送信し、なくなった場合のみ補充されるまで待機する。
+        429/503応答の場合はRetry-Afterに従って待機し、レートを下げて再試行する
+        
+        Args:
+            url: 取得するURL
+        
+        Returns:
+            レスポンス
+        """
+        with self._request_slots:
+            for attempt in range(THROTTLE_RETRIES + 1):
+                self._acquire_request_token()
+                response = self.session.get(url, timeout=10)
+                
+                if response.status_code not in (429, 503) or attempt == THROTTLE_RETRIES:
+                    break
+                
+                delay = self._retry_after(response, THROTTLE_BACKOFF * 2 ** attempt)
+                logger.info("アクセス制限のため%.1f秒待機します: %s", delay, url)
+                self._slow_down()
+                time.sleep(delay)
+            
+            response.raise_for_status()
+            self._recover_rate()
+            return response
+    
+    def _acquire_request_token(self) -> None:
+        """トークンを1つ消費し、トークンがない場合は補充されるまで待機"""
+        with self._rate_lock:
+            now = time.monotonic()
+            self._tokens = min(float(REQUEST_BURST),
+                               self._tokens + (now - self._tokens_updated_at) * self._rate)
+            self._tokens_updated_at = now
+            # 先にトークンを予約し、不足分が補充されるまでの時間だけ待機する
+            self._tokens -= 1.0
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+    
+    def _slow_down(self) -> None:
+        """アクセス制限を受けた場合にリクエストのレートを半分にする"""
+        with self._rate_lock:
+            self._rate = max(self._rate / 2, REQUEST_RATE / 8)
+    
+    def _recover_rate(self) -> None:
+        """正常に応答した場合に下げたレートを徐々に戻す"""
+        if self._rate < REQUEST_RATE:
+            with self._rate_lock:
+                self._rate = min(self._rate * 2, REQUEST_RATE)
+    
+    @staticmethod
+    def _retry_after(response: requests.Response, default: float) -> float:
+        """
+        Retry-Afterヘッダーから待機時間（秒）を取得
+        
+        Args:
+            response: 429/503のレスポンス
+            default: ヘッダーがない・秒数でない場合の待機時間
+        
+        Returns:
+            待機時間（秒）
+        """
+        try:
+            return max(float(response.headers['Retry-After']), 0.0)
+        except (KeyError, TypeError, ValueError):
+            return default
+    
+    def search_albums(self, queries: List[Tuple[str, str]], max_workers: int = 8) -> List[List[Dict[str, str]]]:
+        """
+        複数のアルバムを並列で検索（レート制限は全体で共有）
+        
+        Args:
+            queries: (アルバム名, アーティスト名) のリスト
+            max_workers: 同時に検索する最大数
+        
+        Returns:
+            各クエリの検索結果のリスト（queriesと同じ順序）
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda query: self.search_album(*query), queries))
     
     def search_album(self, album_name: str, artist_name: str) -> List[Dict[str, str]]:
         """
@@ -35,51 +273,71 @@ class TowerRecordsScraper:
             artist_name: アーティスト名
         
         Returns:
-            検索結果のリスト
+            検索結果のリスト（キャッシュと共有するため変更しないこと）
         """
         search_query = f"{album_name} {artist_name}"
-        print(f"Tower Records検索: {search_query}")
+        
+        # 同じアルバム名・アーティスト名の検索はキャッシュから返す
+        cache_key = f"{album_name.strip().lower()}|{artist_name.strip().lower()}"
+        with self._cache_lock:
+            cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Tower Records検索（キャッシュ）: %s", search_query)
+            return cached
+        
+        logger.info("Tower Records検索: %s", search_query)
         
         try:
-            # 検索クエリの前処理（半角記号を全角に変換）
-            processed_query = search_query.replace('&', '＆')  # 半角&を全角＆に変換
-            
-            # 検索クエリをURL エンコード（パス形式）
-            encoded_query = quote(processed_query, safe='')
+            # 検索クエリを前処理してURLエンコード（パス形式）
+            encoded_query = _encode_query(search_query)
             # CDのみを検索するためのフォーマットパラメータを追加
             search_url = f"{self.search_url}/{encoded_query}?format=121%7C131"
             
-            print(f"元の検索クエリ: {search_query}")
-            print(f"処理後の検索クエリ: {processed_query}")
-            print(f"検索URL: {search_url}")
+            logger.debug("元の検索クエリ: %s", search_query)
+            logger.debug("検索URL: %s", search_url)
             
             # リクエスト実行（レート制限対応）
-            time.sleep(1)  # 1秒待機
-            response = self.session.get(search_url, timeout=10)
-            response.raise_for_status()
+            response = self._fetch(search_url)
             
-            # HTMLを解析
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # HTMLを解析して検索結果を抽出
+            results = self.parse_search_page(response.content)
             
-            # 検索結果を解析
-            results = self._parse_search_results(soup)
+            logger.info("検索結果: %s件", len(results))
             
-            print(f"検索結果: {len(results)}件")
+            with self._cache_lock:
+                # 上限を超える場合は最も古いエントリを削除
+                if len(self._search_cache) >= SEARCH_CACHE_MAXSIZE:
+                    del self._search_cache[next(iter(self._search_cache))]
+                self._search_cache[cache_key] = results
             return results
             
         except requests.RequestException as e:
-            print(f"Tower Records検索エラー: {e}")
+            logger.warning("Tower Records検索エラー: %s", e)
             return []
         except Exception as e:
-            print(f"検索結果解析エラー: {e}")
+            logger.warning("検索結果解析エラー: %s", e)
             return []
     
-    def _parse_search_results(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
+    def parse_search_page(self, content: bytes) -> List[Dict[str, str]]:
+        """
+        検索結果ページのHTMLを解析（通信を行わないため、取得とは別のスレッドで実行できる）
+        
+        Args:
+            content: 検索結果ページのHTML
+        
+        Returns:
+            検索結果のリスト
+        """
+        soup = BeautifulSoup(content, _HTML_PARSER, from_encoding=PAGE_ENCODING)
+        return self._parse_search_results(soup, content)
+    
+    def _parse_search_results(self, soup: BeautifulSoup, content: bytes = b'') -> List[Dict[str, str]]:
         """
         検索結果HTMLを解析して情報を抽出
         
         Args:
             soup: BeautifulSoupオブジェクト
+            content: 解析したHTML（デバッグ情報の表示に使用）
         
         Returns:
             検索結果のリスト
@@ -91,76 +349,97 @@ class TowerRecordsScraper:
             product_items = []
             
             # 複数のセレクタを試行
-            selectors = [
-                '.TOL-item-search-result-PC-result-tile-display-item',  # 正しい商品アイテム
-                '.tr-item-block',
-                '.item-block',
-                '.search-result-item',
-                '[class*="item"]',
-                '[class*="product"]',
-                '.item',
-                '.product'
-            ]
-            
-            for selector in selectors:
-                product_items = soup.select(selector)
+            # 使用するのは最大10件のため、11件目以降は探索しない
+            for selector in self._PRODUCT_ITEM_SELECTORS:
+                product_items = soup.select(selector, limit=MAX_SEARCH_RESULTS)
                 if product_items:
-                    print(f"商品要素を発見: {selector} ({len(product_items)}件)")
+                    logger.debug("商品要素を発見: %s (%s件)", selector, len(product_items))
                     break
             
             # 各商品アイテムを処理
-            for item in product_items[:10]:  # 最大10件まで
+            for item in product_items:
                 try:
                     result = self._extract_product_info(item)
                     if result:
                         results.append(result)
                 except Exception as e:
-                    print(f"商品情報抽出エラー: {e}")
+                    logger.warning("商品情報抽出エラー: %s", e)
                     continue
             
             # 結果が空の場合、デバッグ情報を表示
-            if not results:
-                self._debug_html_structure(soup)
+            if not results and logger.isEnabledFor(logging.DEBUG):
+                self._debug_html_structure(soup, content)
         
         except Exception as e:
-            print(f"検索結果解析エラー: {e}")
+            logger.warning("検索結果解析エラー: %s", e)
         
         return results
     
-    def _debug_html_structure(self, soup: BeautifulSoup):
-        """デバッグ用：HTMLの構造を分析"""
-        print("\n=== デバッグ情報 ===")
+    def _debug_html_structure(self, soup: BeautifulSoup, content: bytes = b''):
+        """デバッグ用：HTMLの構造を分析（DEBUGレベルのログが無効な場合は何もしない）"""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        
+        logger.debug("=== デバッグ情報 ===")
         
         # タイトルタグを確認
         title = soup.find('title')
         if title:
-            print(f"ページタイトル: {title.get_text(strip=True)}")
+            logger.debug("ページタイトル: %s", title.get_text(strip=True))
         
         # 検索結果数を確認
-        result_count_selectors = ['.result-count', '.search-count', '[class*="count"]']
-        for selector in result_count_selectors:
+        for selector in self._RESULT_COUNT_SELECTORS:
             count_elem = soup.select_one(selector)
             if count_elem:
-                print(f"結果数表示: {count_elem.get_text(strip=True)}")
+                logger.debug("結果数表示: %s", count_elem.get_text(strip=True))
         
         # よく使われるクラス名を確認
-        common_classes = ['item', 'product', 'result', 'card', 'block', 'box']
-        for class_name in common_classes:
-            elements = soup.find_all(class_=lambda x: x and class_name in x.lower())
+        for class_name in self._COMMON_CLASSES:
+            # クラス名の部分一致（大文字小文字を区別しない）をCSSセレクタで検索
+            elements = soup.select(f'[class*="{class_name}" i]')
             if elements:
-                print(f"'{class_name}' 関連クラス: {len(elements)}個")
+                logger.debug("'%s' 関連クラス: %s個", class_name, len(elements))
                 # 最初の要素のクラス名を表示
                 if elements[0].get('class'):
-                    print(f"  例: {' '.join(elements[0]['class'])}")
+                    logger.debug("  例: %s", ' '.join(elements[0]['class']))
+        
+        # HTMLの一部を表示（解析前のHTMLから切り出し、body全体の文字列化を避ける）
+        body_start = content.find(b'<body')
+        if body_start >= 0:
+            # bodyの最初の1000バイトを表示
+            body_text = content[body_start:body_start + 1000].decode(PAGE_ENCODING, errors='replace')
+            logger.debug("HTML構造（最初の1000バイト）:\n%s...", body_text)
+        
+        logger.debug("==================")
+    
+    def _select_text(self, item, primary: str, fallbacks: Tuple[str, ...]) -> str:
+        """
+        セレクタに一致する要素のテキストを取得
+        
+        まず主セレクタを試し、テキストが得られない場合のみ代替セレクタを順に試行する
+        
+        Args:
+            item: BeautifulSoupの商品要素
+            primary: 主セレクタ
+            fallbacks: 代替セレクタ
+        
+        Returns:
+            要素のテキスト、見つからない場合は空文字列
+        """
+        elem = item.select_one(primary)
+        if elem:
+            text = elem.get_text(strip=True)
+            if text:
+                return text
         
-        # HTMLの一部を表示
-        body = soup.find('body')
-        if body:
-            # bodyの最初の1000文字を表示
-            body_text = str(body)[:1000]
-            print(f"\nHTML構造（最初の1000文字）:\n{body_text}...")
+        for selector in fallbacks:
+            elem = item.select_one(selector)
+            if elem:
+                text = elem.get_text(strip=True)
+                if text:
+                    return text
         
-        print("==================")
+        return ""
     
     def _extract_product_info(self, item) -> Optional[Dict[str, str]]:
         """
@@ -173,45 +452,13 @@ class TowerRecordsScraper:
             商品情報の辞書
         """
         try:
-            # Tower Records特有のクラス名を含む複数のセレクタを試行
+            # Tower Records特有のセレクタで取得し、取得できない場合のみ汎用セレクタを試行
             
             # タイトル取得
-            title_selectors = [
-                '.tr-item-block-info-item-name a',  # 正しいタイトルセレクタ
-                '.tr-item-block-info-title',
-                '.item-title', 
-                '.product-title',
-                '.title',
-                'h3', 'h4', 'h5',
-                '[class*="title"]',
-                'a'
-            ]
-            
-            title = ""
-            for selector in title_selectors:
-                title_elem = item.select_one(selector)
-                if title_elem:
-                    title = title_elem.get_text(strip=True)
-                    if title:
-                        break
+            title = self._select_text(item, self._TITLE_SEL, self._TITLE_SELECTORS)
             
             # アーティスト取得
-            artist_selectors = [
-                '.tr-item-block-info-artist-name p a',  # 正しいアーティストセレクタ
-                '.tr-item-block-info-artist-name',
-                '.artist-name',
-                '.artist',
-                '.performer',
-                '[class*="artist"]'
-            ]
-            
-            artist = ""
-            for selector in artist_selectors:
-                artist_elem = item.select_one(selector)
-                if artist_elem:
-                    artist = artist_elem.get_text(strip=True)
-                    if artist:
-                        break
+            artist = self._select_text(item, self._ARTIST_SEL, self._ARTIST_SELECTORS)
             
             # リンク取得（tr-item-blockクラスを持つaタグを優先）
             link_elem = item.select_one('a.tr-item-block[href]')
@@ -227,47 +474,19 @@ class TowerRecordsScraper:
                     link = href
             
             # 価格取得
-            price_selectors = [
-                '.tr-item-block-info-price span',  # 正しい価格セレクタ
-                '.tr-item-block-info-price',
-                '.price',
-                '.cost',
-                '[class*="price"]'
-            ]
-            
-            price = ""
-            for selector in price_selectors:
-                price_elem = item.select_one(selector)
-                if price_elem:
-                    price = price_elem.get_text(strip=True)
-                    if price:
-                        break
+            price = self._select_text(item, self._PRICE_SEL, self._PRICE_SELECTORS)
             
             # レーベル取得
-            label_selectors = [
-                '.tr-item-block-info-label',
-                '.label',
-                '.publisher',
-                '[class*="label"]'
-            ]
-            
-            label = ""
-            for selector in label_selectors:
-                label_elem = item.select_one(selector)
-                if label_elem:
-                    label = label_elem.get_text(strip=True)
-                    if label:
-                        break
+            label = self._select_text(item, self._LABEL_SEL, self._LABEL_SELECTORS)
             
             # 商品IDを取得
             product_id = ""
-            import re
             
             # まずリンクのhrefからIDを抽出（最も確実）
             if link_elem and link_elem.get('href'):
                 href = link_elem['href']
                 # /item/4497459 のような形式からIDを抽出
-                match = re.search(r'/item/(\d+)', href)
+                match = _ITEM_ID_RE.search(href)
                 if match:
                     product_id = match.group(1)
             
@@ -277,7 +496,7 @@ class TowerRecordsScraper:
                 cart_button = item.select_one('button[onclick*="cartinsearchresult"]')
                 if cart_button and cart_button.get('onclick'):
                     onclick = cart_button['onclick']
-                    match = re.search(r'cartinsearchresult\((\d+)\)', onclick)
+                    match = _CART_ID_RE.search(onclick)
                     if match:
                         product_id = match.group(1)
             
@@ -285,18 +504,14 @@ class TowerRecordsScraper:
             if product_id:
                 link = f"{self.base_url}/item/{product_id}"
             
-            # デバッグ情報を詳細化
-            print(f"抽出結果:")
-            print(f"  タイトル: {title[:50]}...")
-            print(f"  アーティスト: {artist[:30]}...")
-            print(f"  商品ID: {product_id}")
-            print(f"  リンク: {link}")
-            print(f"  要素のクラス: {item.get('class', 'なし')}")
-            
-            # HTMLの一部を表示（デバッグ用）
-            item_html = str(item)[:300]
-            print(f"  要素HTML: {item_html}...")
-            print()
+            # デバッグ情報を詳細化（要素のHTML化はデバッグ時のみ行う）
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "抽出結果:\n  タイトル: %s...\n  アーティスト: %s...\n  商品ID: %s\n"
+                    "  リンク: %s\n  要素のクラス: %s\n  要素HTML: %s...",
+                    title[:50], artist[:30], product_id, link,
+                    item.get('class', 'なし'), str(item)[:300]
+                )
             
             # IDまたは何らかの情報があれば返す
             if product_id or title or artist:
@@ -310,7 +525,7 @@ class TowerRecordsScraper:
                 }
             
         except Exception as e:
-            print(f"商品情報抽出エラー: {e}")
+            logger.warning("商品情報抽出エラー: %s", e)
         
         return None
     
@@ -324,71 +539,220 @@ class TowerRecordsScraper:
         Returns:
             詳細ページのHTML文字列
         """
+        with self._cache_lock:
+            cached = self._parsed_detail_cache.get(product_url)
+        if cached is not None:
+            return cached[0]
+        
         try:
-            print(f"詳細ページHTML取得: {product_url}")
+            logger.info("詳細ページHTML取得: %s", product_url)
             
-            time.sleep(1)  # レート制限対応
-            response = self.session.get(product_url, timeout=10)
-            response.raise_for_status()
+            content = self._fetch_detail_content(product_url)
             
-            return response.text
+            return content.decode(PAGE_ENCODING, errors='replace')
             
         except Exception as e:
-            print(f"詳細ページHTML取得エラー: {e}")
+            logger.warning("詳細ページHTML取得エラー: %s", e)
             return None
     
-    def parse_track_credits(self, product_url: str) -> List[Dict[str, any]]:
+    def _fetch_detail_content(self, product_url: str) -> bytes:
         """
-        商品詳細ページから収録内容の作曲者情報を解析
+        商品詳細ページのHTMLを取得（キャッシュ済みの場合は通信しない）
+        
+        別スレッドが同じURLを取得中の場合は、その取得結果を待って共有する
         
         Args:
             product_url: 商品ページのURL
         
         Returns:
-            楽曲情報のリスト
+            詳細ページのHTML
         """
+        with self._cache_lock:
+            in_flight = self._detail_in_flight.get(product_url)
+            if in_flight is None:
+                future = Future()
+                self._detail_in_flight[product_url] = future
+        
+        if in_flight is not None:
+            return in_flight.result()
+        
+        # キャッシュファイルの読み書きは_cache_lockの外で行う
         try:
-            print(f"収録内容解析: {product_url}")
-            
-            time.sleep(1)  # レート制限対応
-            response = self.session.get(product_url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            tracks = []
-            
-            # 収録内容のリストを取得
-            track_items = soup.select('.TOL-item-info-PC-tab-recorded-contents-list-track-item')
-            
-            for track_item in track_items:
-                track_info = {}
-                
-                # 曲番号とタイトルを取得
-                track_number_elem = track_item.select_one('.TOL-item-info-PC-tab-recorded-contents-list-track-number span')
-                track_title_elem = track_item.select_one('.TOL-item-info-PC-tab-recorded-contents-list-track-title')
-                track_length_elem = track_item.select_one('.TOL-item-info-PC-tab-recorded-contents-list-track-length')
+            content = self._load_cached_detail(product_url)
+            if content is None:
+                content = self._fetch(product_url).content  # レート制限対応
+                self._store_cached_detail(product_url, content)
+        except BaseException as e:
+            future.set_exception(e)
+            with self._cache_lock:
+                del self._detail_in_flight[product_url]
+            raise
+        
+        with self._cache_lock:
+            del self._detail_in_flight[product_url]
+        future.set_result(content)
+        return content
+    
+    def _load_cached_detail(self, product_url: str) -> Optional[bytes]:
+        """
+        キャッシュファイルから有効期間内の商品詳細ページを取得
+        
+        Returns:
+            詳細ページのHTML（保存されていない・期限切れの場合はNone）
+        """
+        if not self._detail_cache_file:
+            return None
+        
+        try:
+            with self._detail_cache_file_lock, shelve.open(self._detail_cache_file, flag='r') as cache:
+                cached = cache.get(product_url)
+        except Exception:
+            # キャッシュファイルがまだない・読み込めない場合は取得する
+            return None
+        
+        if cached and time.time() - cached[0] < DETAIL_CACHE_TTL:
+            return cached[1]
+        return None
+    
+    def _store_cached_detail(self, product_url: str, content: bytes) -> None:
+        """
+        商品詳細ページをキャッシュファイルに保存
+        
+        保存日時の一覧を保存順に保持し、期限切れのエントリと上限を超えた古いエントリを削除する
+        （保存済みのページ本体は読み込まない）
+        """
+        if not self._detail_cache_file:
+            return
+        
+        try:
+            Path(self._detail_cache_file).parent.mkdir(parents=True, exist_ok=True)
+            with self._detail_cache_file_lock, shelve.open(self._detail_cache_file) as cache:
+                index = cache.get(_DETAIL_CACHE_INDEX_KEY)
+                if index is None:
+                    # 保存日時の一覧がない古いキャッシュファイルは、既存のエントリを期限切れとして扱う
+                    index = dict.fromkeys((key for key in cache.keys() if key != _DETAIL_CACHE_INDEX_KEY), 0.0)
                 
-                if track_number_elem:
-                    track_info['track_number'] = track_number_elem.get_text(strip=True)
-                if track_title_elem:
-                    track_info['title'] = track_title_elem.get_text(strip=True)
-                if track_length_elem:
-                    track_info['length'] = track_length_elem.get_text(strip=True)
+                now = time.time()
+                index.pop(product_url, None)
+                index[product_url] = now
+                cache[product_url] = (now, content)
                 
-                # 詳細情報（作曲者など）を取得
-                hidden_area = track_item.select_one('.TOL-item-info-PC-tab-recorded-contents-list-track-hidden-area')
-                if hidden_area:
-                    credits = self._parse_track_credits_from_hidden_area(hidden_area)
-                    track_info.update(credits)
+                # 古い順に、期限切れまたは上限を超えたエントリを削除
+                while index:
+                    oldest_url = next(iter(index))
+                    if len(index) <= DETAIL_CACHE_MAXSIZE and now - index[oldest_url] < DETAIL_CACHE_TTL:
+                        break
+                    del index[oldest_url]
+                    if oldest_url in cache:
+                        del cache[oldest_url]
                 
-                tracks.append(track_info)
+                cache[_DETAIL_CACHE_INDEX_KEY] = index
+        except Exception as e:
+            logger.warning("詳細ページキャッシュ保存エラー: %s", e)
+    
+    def parse_track_credits(self, product_url: str) -> List[Dict[str, any]]:
+        """
+        商品詳細ページから収録内容の作曲者情報を解析
+        
+        Args:
+            product_url: 商品ページのURL
+        
+        Returns:
+            楽曲情報のリスト（キャッシュと共有するため変更しないこと）
+        """
+        return self.fetch_and_parse_detail(product_url)[1]
+    
+    def fetch_and_parse_detail(self, product_url: str) -> Tuple[Optional[str], List[Dict[str, any]]]:
+        """
+        商品詳細ページを1回だけ取得・解析し、HTMLと収録内容の作曲者情報を返す
+        
+        結果は保持し、同じURLのget_product_detail_html・parse_track_credits呼び出しでも再利用する
+        
+        Args:
+            product_url: 商品ページのURL
+        
+        Returns:
+            (詳細ページのHTML文字列, 楽曲情報のリスト) のタプル、失敗時は (None, [])
+            （キャッシュと共有するため変更しないこと）
+        """
+        with self._cache_lock:
+            cached = self._parsed_detail_cache.get(product_url)
+        if cached is not None:
+            return cached
+        
+        try:
+            logger.info("収録内容解析: %s", product_url)
             
-            return tracks
+            content = self._fetch_detail_content(product_url)
+            
+            result = (content.decode(PAGE_ENCODING, errors='replace'), self.parse_detail_page(content))
             
         except Exception as e:
-            print(f"収録内容解析エラー: {e}")
-            return []
+            logger.warning("収録内容解析エラー: %s", e)
+            return None, []
+        
+        with self._cache_lock:
+            # 上限を超える場合は最も古いエントリを削除
+            if len(self._parsed_detail_cache) >= PARSED_DETAIL_CACHE_MAXSIZE:
+                del self._parsed_detail_cache[next(iter(self._parsed_detail_cache))]
+            self._parsed_detail_cache[product_url] = result
+        return result
+    
+    def parse_many_track_credits(self, product_urls: List[str], max_workers: int = 8) -> List[List[Dict[str, any]]]:
+        """
+        複数の商品詳細ページの収録内容を並列で解析（レート制限は全体で共有）
+        
+        Args:
+            product_urls: 商品ページのURLのリスト
+            max_workers: 同時に解析する最大数
+        
+        Returns:
+            各商品の楽曲情報のリスト（product_urlsと同じ順序）
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.parse_track_credits, product_urls))
+    
+    def parse_detail_page(self, content: bytes) -> List[Dict[str, any]]:
+        """
+        商品詳細ページのHTMLから収録内容の作曲者情報を解析（通信を行わないため、取得とは別のスレッドで実行できる）
+        
+        Args:
+            content: 商品詳細ページのHTML
+        
+        Returns:
+            楽曲情報のリスト
+        """
+        soup = BeautifulSoup(content, _HTML_PARSER, from_encoding=PAGE_ENCODING)
+        
+        tracks = []
+        
+        # 収録内容のリストを取得
+        track_items = soup.select(self._TRACK_ITEM_SEL)
+        
+        for track_item in track_items:
+            track_info = {}
+        
+            # 曲番号とタイトルを取得
+            track_number_elem = track_item.select_one(self._TRACK_NUMBER_SEL)
+            track_title_elem = track_item.select_one(self._TRACK_TITLE_SEL)
+            track_length_elem = track_item.select_one(self._TRACK_LENGTH_SEL)
+        
+            if track_number_elem:
+                track_info['track_number'] = track_number_elem.get_text(strip=True)
+            if track_title_elem:
+                track_info['title'] = track_title_elem.get_text(strip=True)
+            if track_length_elem:
+                track_info['length'] = track_length_elem.get_text(strip=True)
+        
+            # 詳細情報（作曲者など）を取得
+            hidden_area = track_item.select_one(self._TRACK_HIDDEN_AREA_SEL)
+            if hidden_area:
+                credits = self._parse_track_credits_from_hidden_area(hidden_area)
+                track_info.update(credits)
+        
+            tracks.append(track_info)
+        
+        return tracks
     
     def _parse_track_credits_from_hidden_area(self, hidden_area) -> Dict[str, str]:
         """
@@ -403,38 +767,34 @@ class TowerRecordsScraper:
         credits = {}
         
         try:
-            # 各段落を処理
-            paragraphs = hidden_area.select('.TOL-item-info-PC-tab-recorded-contents-list-track-hidden-paragraph')
-            
-            for paragraph in paragraphs:
-                # div要素を取得
-                divs = paragraph.find_all('div')
-                
-                for div in divs:
-                    # boldなspanでラベルを取得
-                    label_span = div.find('span', class_='is-bold')
-                    if label_span:
-                        label = label_span.get_text(strip=True).replace('：', '').replace(':', '')
-                        
-                        # ラベルの後にあるリンクやテキストを取得
-                        # ラベルのspanを除去して残りのテキストを取得
-                        label_span.decompose()  # 一時的に削除
-                        
-                        # リンクがある場合はリンクテキストを取得
-                        links = div.find_all('a')
-                        if links:
-                            values = []
-                            for link in links:
-                                values.append(link.get_text(strip=True))
-                            credits[label] = ', '.join(values)
-                        else:
-                            # リンクがない場合はテキストを取得
-                            text = div.get_text(strip=True)
-                            if text:
-                                credits[label] = text
+            # 全段落のdiv要素を1回の検索で取得
+            for div in hidden_area.select(self._TRACK_CREDIT_DIV_SEL):
+                # boldなspanでラベルを取得
+                label_span = div.find('span', class_='is-bold')
+                if label_span:
+                    label_text = label_span.get_text(strip=True)
+                    label = label_text.replace('：', '').replace(':', '')
+                    
+                    # ラベルの後にあるリンクやテキストを取得（ツリーは変更しない）
+                    
+                    # リンクがある場合はリンクテキストを取得
+                    links = div.find_all('a')
+                    if links:
+                        values = []
+                        for link in links:
+                            values.append(link.get_text(strip=True))
+                        credits[label] = ', '.join(values)
+                    else:
+                        # リンクがない場合はテキストを取得
+                        # div全体のテキストから先頭のラベル部分を取り除く
+                        text = div.get_text(strip=True)
+                        if text.startswith(label_text):
+                            text = text[len(label_text):].lstrip('：: ').strip()
+                        if text:
+                            credits[label] = text
         
         except Exception as e:
-            print(f"クレジット情報抽出エラー: {e}")
+            logger.warning("クレジット情報抽出エラー: %s", e)
         
         return credits
     
@@ -446,6 +806,8 @@ class TowerRecordsScraper:
 
 # 使用例
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     scraper = TowerRecordsScraper()
     
     try:
@@ -1,6 +1,11 @@
+import functools
+import logging
 import os
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple
 from src.itunes_album_finder import iTunesAlbumFinder
 from src.audio_metadata_extractor import AudioMetadataExtractor
 from src.fetch_itunes_artwork import iTunesArtworkFetcher
@@ -8,9 +13,36 @@ from src.audio_metadata_writer import AudioMetadataWriter
 from src.config import config
 
 
+logger = logging.getLogger(__name__)
+
+# ファイル名に使用できない文字の置換テーブル
+_UNSAFE_TABLE = str.maketrans({char: '_' for char in '/\\:*?"<>|'})
+
+
+@functools.lru_cache(maxsize=4096)
+def _make_safe_filename(filename: str) -> str:
+    """
+    ファイル名として安全な文字列に変換（同じ文字列の結果はキャッシュ）
+    
+    Args:
+        filename: 元のファイル名
+    
+    Returns:
+        安全なファイル名
+    """
+    # 危険な文字を置換
+    return filename.translate(_UNSAFE_TABLE).strip()
+
+
 class AlbumArtworkBatchDownloader:
     """アルバム内全楽曲のアートワークを一括取得するクラス"""
     
+    __slots__ = (
+        'finder', 'extractor', 'artwork_fetcher', 'metadata_writer', 'output_dir', '_output_dir_str',
+        'processed_albums', '_download_executor', '_pending_downloads',
+        '_embed_executor', '_artwork_data', '_path_exists_cache', '_artwork_cache', '_state_lock',
+    )
+    
     def __init__(self, output_dir: str = None):
         # 設定ファイルから出力ディレクトリを取得
         if output_dir is None:
@@ -21,12 +53,37 @@ class AlbumArtworkBatchDownloader:
         self.artwork_fetcher = iTunesArtworkFetcher()
         self.metadata_writer = AudioMetadataWriter()
         self.output_dir = Path(output_dir)
+        # ファイルパスの組み立て用（都度のPathから文字列への変換を省略）
+        self._output_dir_str = str(self.output_dir)
         
         # 出力ディレクトリを作成
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # 既に処理済みのアルバムを記録するセット
-        self.processed_albums = set()
+        # 処理済みのアルバム名と、解決済みのアートワークパスの辞書
+        self.processed_albums: Dict[str, str] = {}
+        
+        # アートワーク画像のダウンロードはバックグラウンドで実行し、
+        # 次のアルバムのiTunes検索と並行させる
+        self._download_executor = ThreadPoolExecutor(max_workers=2)
+        self._pending_downloads: Dict[str, Future] = {}
+        
+        # アートワークの埋め込み（ファイル書き込み）もバックグラウンドで実行する
+        self._embed_executor = ThreadPoolExecutor(max_workers=1)
+        
+        # 取得済みアートワークの画像データ（ファイルパス -> (データ, MIMEタイプ)）
+        # 埋め込み時にファイルを読み直さないようにする（埋め込みで取り出した時点で破棄する）
+        self._artwork_data: Dict[str, Tuple[bytes, str]] = {}
+        
+        # アルバムごとのアートワーク取得結果（(アルバム名, アーティスト名) -> ファイルパス、見つからない場合はNone）
+        # 同じアルバムのiTunes APIへの再検索を省略する
+        self._artwork_cache: Dict[Tuple[str, str], Optional[str]] = {}
+        
+        # ファイルの存在確認結果のキャッシュ（この実行中に作成・削除したファイルは都度更新）
+        self._path_exists_cache: Dict[str, bool] = {}
+        
+        # アルバムごとの検索は並列で実行するため、処理済みアルバム・取得結果・ダウンロード中の
+        # アートワーク・ファイルの存在確認結果の参照と更新はこのロックを保持して行う
+        self._state_lock = threading.Lock()
     
     def download_album_artworks(self, album_name_input: str) -> bool:
         """
@@ -38,61 +95,56 @@ class AlbumArtworkBatchDownloader:
         Returns:
             成功したかどうか
         """
-        print(f"アルバム検索中: '{album_name_input}'")
-        print("=" * 80)
+        logger.info("アルバム検索中: '%s'", album_name_input)
+        logger.info("=" * 80)
         
         # アルバムを検索
         results = self.finder.find_albums_by_name(album_name_input)
         
         if not results:
-            print("該当するアルバムが見つかりませんでした")
+            logger.warning("該当するアルバムが見つかりませんでした")
             return False
         
         total_success = 0
         total_songs = 0
+        embed_jobs = []
         
         # 見つかったアルバムを処理
         for i, album_info in enumerate(results, 1):
-            print(f"\n【{i}】アーティスト: {album_info['artist_name']}")
-            print(f"    アルバム: {album_info['album_name']}")
-            print(f"    楽曲数: {album_info['audio_file_count']}曲")
-            print("-" * 60)
+            logger.info("\n【%s】アーティスト: %s", i, album_info['artist_name'])
+            logger.info("    アルバム: %s", album_info['album_name'])
+            logger.info("    楽曲数: %s曲", album_info['audio_file_count'])
+            logger.info("-" * 60)
             
             # アルバム内のアートワークなしの楽曲を収集
             songs_without_artwork = []
             album_metadata_collection = {}
             
-            for j, audio_file in enumerate(album_info['audio_files'], 1):
-                file_name = Path(audio_file).name
-                print(f"\n  [{j:2d}] {file_name}")
-                
-                # 楽曲のメタデータを取得
-                metadata = self.extractor.extract_metadata(audio_file)
+            # 楽曲ごとのメタデータ取得を並列実行（アーティスト名・アルバム名・アートワーク有無のみ）
+            audio_files = album_info['audio_files']
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                song_results = list(executor.map(self.extractor.extract_album_and_artwork, audio_files))
+            
+            # 結果は元の楽曲順で集計・表示し、アルバム名ごとにまとめる
+            for j, (audio_file, (metadata, parsed)) in enumerate(zip(audio_files, song_results), 1):
+                file_name = os.path.basename(audio_file)
+                logger.info("\n  [%2d] %s", j, file_name)
                 
                 if metadata:
                     # アートワークが既に存在する楽曲はスキップ
                     if metadata['has_artwork']:
-                        print(f"       アートワーク既存 - スキップ")
+                        logger.info("       アートワーク既存 - スキップ")
                         continue
                     
                     total_songs += 1
                     album_name = metadata['album']
                     artist_name = metadata['artist']
-                    print(f"       アートワークなし - 検出されたアルバム名: {album_name}")
-                    
-                    # アートワークなしの楽曲として記録
-                    songs_without_artwork.append(audio_file)
+                    logger.info("       アートワークなし - 検出されたアルバム名: %s", album_name)
                     
-                    # 即座にアートワーク収集を実行
-                    print(f"\n--- アートワーク収集 (楽曲: {file_name}) ---")
-                    song_metadata_list = [metadata]
-                    artwork_info = self._download_artwork_for_scoring(album_name, artist_name, song_metadata_list)
-                    if artwork_info:
-                        print(f"    ✓ アートワーク取得成功 (スコア: {artwork_info['score']})")
-                    else:
-                        print(f"    ✗ アートワーク取得失敗")
+                    # アートワークなしの楽曲として記録（読み込み済みのオブジェクトは埋め込み時に再利用）
+                    songs_without_artwork.append((audio_file, parsed))
                     
-                    # アルバムのメタデータを記録（スコアリング用）
+                    # アルバムのメタデータを記録（アートワーク取得・スコアリング用）
                     if album_name not in album_metadata_collection:
                         album_metadata_collection[album_name] = []
                     album_metadata_collection[album_name].append({
@@ -101,34 +153,116 @@ class AlbumArtworkBatchDownloader:
                         'file': audio_file
                     })
                 else:
-                    print("       メタデータを取得できませんでした")
+                    logger.info("       メタデータを取得できませんでした")
+            
+            # アルバム名ごとに1回だけ、最も多い楽曲のアーティスト名でアートワークを収集
+            # 複数のアルバム名がある場合はiTunes APIの検索を並列で実行
+            album_items = list(album_metadata_collection.items())
+            with ThreadPoolExecutor(max_workers=min(4, len(album_items)) or 1) as executor:
+                artwork_infos = list(executor.map(
+                    lambda item: self._download_artwork_for_scoring(
+                        item[0], self._representative_metadata(item[1])['artist'], item[1]
+                    ),
+                    album_items
+                ))
+            
+            # バックグラウンドのダウンロード完了を待ってから結果を表示する
+            self._wait_for_pending_downloads()
+            
+            for (album_name, metadata_list), artwork_info in zip(album_items, artwork_infos):
+                logger.info("\n--- アートワーク収集 (アルバム: %s, %s曲) ---", album_name, len(metadata_list))
+                if artwork_info and self._exists(artwork_info['path']):
+                    logger.info("    ✓ アートワーク取得成功 (スコア: %s)", artwork_info['score'])
+                else:
+                    logger.warning("    ✗ アートワーク取得失敗")
             
             # アートワーク埋め込みフェーズ
+            best_artwork = None
             if songs_without_artwork and album_metadata_collection:
-                print(f"\n--- アートワーク埋め込みフェーズ ---")
+                logger.info("\n--- アートワーク埋め込みフェーズ ---")
                 best_artwork = self._collect_and_select_best_artwork(album_metadata_collection)
                 
                 if best_artwork:
-                    print(f"最適なアートワーク: {best_artwork['path']}")
+                    logger.info("最適なアートワーク: %s", best_artwork['path'])
                     
                     # 全ての対象楽曲にアートワークを埋め込み
-                    for audio_file in songs_without_artwork:
-                        file_name = Path(audio_file).name
-                        print(f"  埋め込み中: {file_name}")
-                        
-                        embed_success = self.metadata_writer.embed_artwork(audio_file, best_artwork['path'])
-                        if embed_success:
-                            total_success += 1
-                            print(f"       ✓ アートワーク埋め込み成功")
-                        else:
-                            print(f"       ✗ アートワーク埋め込み失敗")
+                    # （ファイルの書き込みは次のアルバムの検索・ダウンロードと並行して実行）
+                    embed_jobs.append(self._embed_executor.submit(
+                        self._embed_artwork_to_songs, best_artwork['path'], songs_without_artwork
+                    ))
                 else:
-                    print(f"適切なアートワークが見つかりませんでした")
+                    logger.warning("適切なアートワークが見つかりませんでした")
+            
+            # 埋め込みに使わないアートワークの画像データは保持しない
+            for artwork_info in artwork_infos:
+                if artwork_info and (best_artwork is None or artwork_info['path'] != best_artwork['path']):
+                    self._artwork_data.pop(artwork_info['path'], None)
+        
+        # 全アルバムの埋め込み完了を待つ
+        for embed_job in embed_jobs:
+            total_success += embed_job.result()
         
-        print(f"\n" + "=" * 80)
-        print(f"処理完了: {total_success}/{total_songs} 件のアートワークを取得")
+        logger.info("\n" + "=" * 80)
+        logger.info("処理完了: %s/%s 件のアートワークを取得", total_success, total_songs)
         return total_success > 0
     
+    def _embed_artwork_to_songs(self, artwork_path: str, songs: List[Tuple[str, Any]]) -> int:
+        """
+        アートワークを複数の楽曲に埋め込み（バックグラウンドで実行）
+        
+        Args:
+            artwork_path: アートワークファイルのパス
+            songs: (音楽ファイルのパス, 読み込み済みのmutagenオブジェクト) のリスト
+        
+        Returns:
+            埋め込みに成功した楽曲数
+        """
+        artwork = self._get_artwork_data(artwork_path)
+        if artwork is None:
+            return 0
+        artwork_data, mime_type = artwork
+        
+        # 楽曲ごとのファイル書き込みを並列実行し、結果は元の楽曲順で集計・表示
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4)) as executor:
+            results = list(executor.map(
+                lambda song: self.metadata_writer.embed_artwork_bytes(song[0], artwork_data, mime_type, parsed=song[1]),
+                songs
+            ))
+        
+        success_count = 0
+        for (audio_file, _), embedded in zip(songs, results):
+            file_name = os.path.basename(audio_file)
+            if embedded:
+                success_count += 1
+                logger.info("  ✓ アートワーク埋め込み成功: %s", file_name)
+            else:
+                logger.warning("  ✗ アートワーク埋め込み失敗: %s", file_name)
+        
+        return success_count
+    
+    def _get_artwork_data(self, artwork_path: str) -> Optional[Tuple[bytes, str]]:
+        """
+        アートワークの画像データを取得
+        
+        ダウンロード時に保持したデータを優先し、なければ保存済みのファイルから読み込む
+        （保持したデータは取り出した時点で破棄し、埋め込みが終わったアルバムの画像をメモリに残さない）
+        
+        Args:
+            artwork_path: アートワークファイルのパス
+        
+        Returns:
+            (画像データ, MIMEタイプ) のタプル（読み込めない場合はNone）
+        """
+        artwork = self._artwork_data.pop(artwork_path, None)
+        if artwork is None:
+            try:
+                with open(artwork_path, 'rb') as f:
+                    artwork = (f.read(), 'image/jpeg')
+            except OSError as e:
+                logger.warning("  アートワーク読み込みエラー: %s", e)
+                return None
+        return artwork
+    
     def _download_artwork_for_album(self, album_name: str, artist_name: str = None) -> Optional[str]:
         """
         アルバム名でアートワークをダウンロード
@@ -144,38 +278,35 @@ class AlbumArtworkBatchDownloader:
         if not album_name or album_name == "Unknown Album":
             return None
         
-        # 既に処理済みの場合は既存ファイルをチェック
-        if album_name in self.processed_albums:
-            # 2パターンのファイル名をチェック
-            if artist_name and artist_name != "Unknown Artist":
-                artist_album_file = f"{self.output_dir}/{self._make_safe_filename(artist_name)}_{self._make_safe_filename(album_name)}.jpg"
-                if os.path.exists(artist_album_file):
-                    return artist_album_file
-            
-            album_file = f"{self.output_dir}/{self._make_safe_filename(album_name)}.jpg"
-            if os.path.exists(album_file):
-                return album_file
-            
-            # ファイルが存在しない場合は処理済みフラグをリセット
-            self.processed_albums.remove(album_name)
+        # 処理済みのアルバムは登録時に存在確認したパスをそのまま返す
+        with self._state_lock:
+            artwork_path = self.processed_albums.get(album_name)
+        if artwork_path:
+            return artwork_path
         
+        # 保存ファイル名（"{アーティスト}_{アルバム}.jpg" と "{アルバム}.jpg"）は1回だけ作成
+        has_artist = artist_name and artist_name != "Unknown Artist"
+        album_filename = f"{_make_safe_filename(album_name)}.jpg"
+        artist_album_filename = f"{_make_safe_filename(artist_name)}_{album_filename}" if has_artist else None
         
         # 1. まず "{アーティスト} {アルバム}" で検索
-        if artist_name and artist_name != "Unknown Artist":
-            print(f"         iTunes APIで検索中: {artist_name} {album_name}")
-            artwork_path = self._try_download_artwork(f"{artist_name} {album_name}", f"{self._make_safe_filename(artist_name)}_{self._make_safe_filename(album_name)}.jpg")
+        if has_artist:
+            logger.info("         iTunes APIで検索中: %s %s", artist_name, album_name)
+            artwork_path = self._try_download_artwork(f"{artist_name} {album_name}", artist_album_filename)
             if artwork_path:
-                self.processed_albums.add(album_name)
+                with self._state_lock:
+                    self.processed_albums[album_name] = artwork_path
                 return artwork_path
         
         # 2. 見つからない場合は "{アルバム}" のみで検索
-        print(f"         iTunes APIで検索中: {album_name}")
-        artwork_path = self._try_download_artwork(album_name, f"{self._make_safe_filename(album_name)}.jpg")
+        logger.info("         iTunes APIで検索中: %s", album_name)
+        artwork_path = self._try_download_artwork(album_name, album_filename)
         if artwork_path:
-            self.processed_albums.add(album_name)
+            with self._state_lock:
+                self.processed_albums[album_name] = artwork_path
             return artwork_path
         
-        print(f"         iTunes APIで見つかりませんでした")
+        logger.warning("         iTunes APIで見つかりませんでした")
         return None
     
     def _try_download_artwork(self, search_query: str, filename: str) -> Optional[str]:
@@ -189,11 +320,13 @@ class AlbumArtworkBatchDownloader:
         Returns:
             ダウンロードしたファイルのパス（失敗時はNone）
         """
-        target_path = f"{self.output_dir}/{filename}"
+        target_path = f"{self._output_dir_str}/{filename}"
         
-        # 既にファイルが存在する場合はそれを返す
-        if os.path.exists(target_path):
-            print(f"         既に存在: {filename}")
+        # 既にファイルが存在する（またはダウンロード中の）場合はそれを返す
+        with self._state_lock:
+            available = self._is_artwork_available(target_path)
+        if available:
+            logger.info("         既に存在: %s", filename)
             return target_path
         
         try:
@@ -209,39 +342,102 @@ class AlbumArtworkBatchDownloader:
                 target_artist = None
                 target_album = search_query
             
-            downloaded_items = list(self.artwork_fetcher.search_and_download(
+            # 検索のみ同期的に行い、画像のダウンロードはバックグラウンドで実行
+            artwork_info = self.artwork_fetcher.search_artwork(
                 query=search_query,
-                output_dir=str(self.output_dir),
                 quality=config.get_artwork_quality(),
                 country=config.get_itunes_api_country(),
                 target_artist=target_artist,
                 target_album=target_album
-            ))
+            )
             
-            if downloaded_items:
-                # ダウンロードされたファイル名を変更
-                downloaded_item = downloaded_items[0]
-                old_filename = downloaded_item['filename']
-                
-                # 実際に取得されたアルバム名を使用してファイル名を決定
-                actual_album = downloaded_item.get('album', target_album or search_query)
-                album_filename = f"{self.output_dir}/{self._make_safe_filename(actual_album)}.jpg"
-                
-                # ファイル名を変更
-                if os.path.exists(old_filename):
-                    os.rename(old_filename, album_filename)
-                    print(f"         保存完了: {self._make_safe_filename(actual_album)}.jpg")
-                    return album_filename
-                else:
-                    print(f"         ダウンロードファイルが見つかりません")
-                    return None
-            else:
+            if not artwork_info:
                 return None
+            
+            # 実際に取得されたアルバム名を使用してファイル名を決定
+            actual_album = artwork_info.get('album', target_album or search_query)
+            album_filename = f"{self._output_dir_str}/{_make_safe_filename(actual_album)}.jpg"
+            
+            # ダウンロード完了までは別名で保存し、完了後にファイル名を変更
+            # 別のアルバムが同じファイルを保存済み・ダウンロード中の場合はダウンロードしない
+            with self._state_lock:
+                if not self._is_artwork_available(album_filename):
+                    self._pending_downloads[album_filename] = self._download_executor.submit(
+                        self._download_artwork_file, artwork_info['artwork_url'], album_filename
+                    )
+            return album_filename
                 
         except Exception as e:
-            print(f"         エラー: {e}")
+            logger.warning("         エラー: %s", e)
             return None
     
+    def _download_artwork_file(self, url: str, target_filename: str) -> bool:
+        """
+        アートワーク画像をダウンロードして保存（バックグラウンドで実行）
+        
+        画像データはメモリ上に保持して埋め込みに使用し、ファイルは確認用に保存する
+        
+        Args:
+            url: アートワークのURL
+            target_filename: 保存先のファイルパス
+        
+        Returns:
+            成功したかどうか
+        """
+        artwork = self.artwork_fetcher.fetch_artwork(url)
+        if artwork is None:
+            return False
+        self._artwork_data[target_filename] = artwork
+        
+        part_filename = f"{target_filename}.part"
+        try:
+            with open(part_filename, 'wb') as f:
+                f.write(artwork[0])
+            os.replace(part_filename, target_filename)
+            with self._state_lock:
+                self._path_exists_cache[target_filename] = True
+            logger.info("         保存完了: %s", os.path.basename(target_filename))
+            return True
+        
+        except OSError as e:
+            logger.warning("         保存エラー: %s", e)
+            return False
+    
+    def _is_artwork_available(self, artwork_path: str) -> bool:
+        """アートワークが保存済み、またはダウンロード中かどうかを確認（_state_lockを保持して呼び出す）"""
+        return artwork_path in self._pending_downloads or self._exists(artwork_path)
+    
+    def _exists(self, path: str) -> bool:
+        """ファイルの存在を確認（結果をキャッシュしてstat呼び出しを削減、並列処理中は_state_lockを保持して呼び出す）"""
+        exists = self._path_exists_cache.get(path)
+        if exists is None:
+            try:
+                os.stat(path)
+                exists = True
+            except OSError:
+                exists = False
+            self._path_exists_cache[path] = exists
+        return exists
+    
+    def _wait_for_pending_downloads(self) -> None:
+        """バックグラウンドで実行中のアートワークダウンロードの完了を待つ"""
+        with self._state_lock:
+            pending_downloads = list(self._pending_downloads.items())
+        
+        for artwork_path, future in pending_downloads:
+            succeeded = future.result()
+            with self._state_lock:
+                if not succeeded:
+                    logger.warning("         ダウンロード失敗: %s", os.path.basename(artwork_path))
+                    # 失敗したパスを処理済みアルバム・取得結果・存在確認のキャッシュから外し、次回は再検索させる
+                    for album_name in [name for name, path in self.processed_albums.items() if path == artwork_path]:
+                        del self.processed_albums[album_name]
+                    for key in [key for key, path in self._artwork_cache.items() if path == artwork_path]:
+                        del self._artwork_cache[key]
+                    self._path_exists_cache.pop(artwork_path, None)
+                    self._artwork_data.pop(artwork_path, None)
+                del self._pending_downloads[artwork_path]
+    
     def _collect_and_select_best_artwork(self, album_metadata_collection: Dict[str, List[Dict]]) -> Optional[Dict[str, str]]:
         """
         アルバムのメタデータコレクションから全てのアートワークを収集し、最適なものを選択
@@ -254,46 +450,52 @@ class AlbumArtworkBatchDownloader:
         """
         all_artworks = []
         
-        # 各アルバムのアートワークを収集（既に個別楽曲ごとに収集済みのため、ここは結果をまとめる）
-        # tmp/artwork/*.jpgから既存のアートワークファイルを収集
-        import glob
-        artwork_pattern = f"{self.output_dir}/*.jpg"
-        existing_artworks = glob.glob(artwork_pattern)
-        
-        for artwork_path in existing_artworks:
-            # ファイル名からアルバム情報を推定
-            filename = os.path.basename(artwork_path).replace('.jpg', '')
+        # 各アルバムのアートワークを収集（既にアルバムごとに取得済みのため、ここは結果をまとめる）
+        # 出力ディレクトリを走査せず、取得時に記録したファイルパスを参照する
+        for album_name, metadata_list in album_metadata_collection.items():
+            if not metadata_list:
+                continue
+            matching_metadata = self._representative_metadata(metadata_list)
+            artwork_path = self._artwork_cache.get((album_name, matching_metadata.get('artist', '')))
+            if not artwork_path or not self._exists(artwork_path):
+                continue
             
-            # アルバム名に一致するメタデータを検索
-            matching_metadata = None
-            for album_name, metadata_list in album_metadata_collection.items():
-                if album_name.lower() in filename.lower() or filename.lower() in album_name.lower():
-                    matching_metadata = metadata_list[0] if metadata_list else {}
-                    break
+            score = self._calculate_artwork_score(artwork_path, 
+                                                matching_metadata.get('album', ''), 
+                                                matching_metadata.get('artist', ''), 
+                                                [matching_metadata])
             
-            if matching_metadata:
-                score = self._calculate_artwork_score(artwork_path, 
-                                                    matching_metadata.get('album', ''), 
-                                                    matching_metadata.get('artist', ''), 
-                                                    [matching_metadata])
-                
-                all_artworks.append({
-                    'path': artwork_path,
-                    'album': matching_metadata.get('album', ''),
-                    'artist': matching_metadata.get('artist', ''),
-                    'score': score,
-                    'metadata_count': 1
-                })
+            all_artworks.append({
+                'path': artwork_path,
+                'album': matching_metadata.get('album', ''),
+                'artist': matching_metadata.get('artist', ''),
+                'score': score,
+                'metadata_count': 1
+            })
         
         if not all_artworks:
             return None
         
         # スコアに基づいて最適なアートワークを選択
         best_artwork = max(all_artworks, key=lambda x: x['score'])
-        print(f"  最適なアートワーク選択: {best_artwork['album']} (スコア: {best_artwork['score']})")
+        logger.info("  最適なアートワーク選択: %s (スコア: %s)", best_artwork['album'], best_artwork['score'])
         
         return best_artwork
     
+    def _representative_metadata(self, metadata_list: List[Dict]) -> Dict:
+        """
+        アルバムの楽曲のうち、最も多くの楽曲に付いているアーティスト名を持つ楽曲のメタデータを取得
+        （同数の場合は先に現れたアーティスト名を優先）
+        
+        Args:
+            metadata_list: そのアルバムのメタデータリスト（1件以上）
+        
+        Returns:
+            代表とする楽曲のメタデータ
+        """
+        artist_name = Counter(meta['artist'] for meta in metadata_list).most_common(1)[0][0]
+        return next(meta for meta in metadata_list if meta['artist'] == artist_name)
+    
     def _download_artwork_for_scoring(self, album_name: str, artist_name: str, metadata_list: List[Dict]) -> Optional[Dict[str, any]]:
         """
         スコアリング用のアートワークダウンロード
@@ -306,7 +508,15 @@ class AlbumArtworkBatchDownloader:
         Returns:
             アートワーク情報とスコア
         """
-        artwork_path = self._download_artwork_for_album(album_name, artist_name)
+        # 同じアルバムは1回だけ検索・ダウンロードする（見つからなかった結果も記録）
+        key = (album_name, artist_name)
+        with self._state_lock:
+            cached = key in self._artwork_cache
+            artwork_path = self._artwork_cache.get(key)
+        if not cached:
+            artwork_path = self._download_artwork_for_album(album_name, artist_name)
+            with self._state_lock:
+                self._artwork_cache[key] = artwork_path
         if not artwork_path:
             return None
         
@@ -360,90 +570,88 @@ class AlbumArtworkBatchDownloader:
         
         return score
     
-    def _make_safe_filename(self, filename: str) -> str:
-        """
-        ファイル名として安全な文字列に変換
-        
-        Args:
-            filename: 元のファイル名
-        
-        Returns:
-            安全なファイル名
-        """
-        # 危険な文字を置換
-        unsafe_chars = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
-        safe_filename = filename
-        for char in unsafe_chars:
-            safe_filename = safe_filename.replace(char, '_')
-        
-        return safe_filename.strip()
-    
     def show_summary(self) -> None:
         """処理結果のサマリーを表示"""
-        print(f"\n処理済みアルバム数: {len(self.processed_albums)}")
+        logger.info("\n処理済みアルバム数: %s", len(self.processed_albums))
         if self.processed_albums:
-            print("取得したアートワーク:")
-            for i, album in enumerate(sorted(self.processed_albums), 1):
-                safe_name = self._make_safe_filename(album)
-                print(f"  {i:2d}. {safe_name}.jpg ({album})")
+            logger.info("取得したアートワーク:")
+            for i, (album, artwork_path) in enumerate(sorted(self.processed_albums.items()), 1):
+                logger.info("  %2d. %s (%s)", i, os.path.basename(artwork_path), album)
     
     def cleanup_artwork_files(self) -> None:
         """一時的なアートワークファイルを削除"""
         try:
-            import glob
-            
-            # tmp/artwork/*.jpg のパターンでファイルを検索
-            artwork_pattern = f"{self.output_dir}/*.jpg"
-            artwork_files = glob.glob(artwork_pattern)
+            # tmp/artwork/*.jpg に該当するファイルを検索（隠しファイルは除く）
+            with os.scandir(self.output_dir) as entries:
+                artwork_files = [
+                    entry.path for entry in entries
+                    if entry.name.endswith('.jpg') and not entry.name.startswith('.') and entry.is_file()
+                ]
             
             if artwork_files:
-                print(f"\n一時アートワークファイルを削除中...")
+                logger.info("\n一時アートワークファイルを削除中...")
                 deleted_count = 0
                 
                 for file_path in artwork_files:
+                    file_name = os.path.basename(file_path)
                     try:
                         os.remove(file_path)
-                        file_name = Path(file_path).name
-                        print(f"  削除: {file_name}")
+                        self._path_exists_cache[file_path] = False
+                        self._artwork_data.pop(file_path, None)
+                        logger.info("  削除: %s", file_name)
                         deleted_count += 1
                     except Exception as e:
-                        print(f"  削除失敗: {Path(file_path).name} - {e}")
+                        logger.warning("  削除失敗: %s - %s", file_name, e)
                 
-                print(f"削除完了: {deleted_count}件のファイルを削除しました")
+                logger.info("削除完了: %s件のファイルを削除しました", deleted_count)
             else:
-                print("\n削除対象のアートワークファイルはありませんでした")
+                logger.info("\n削除対象のアートワークファイルはありませんでした")
                 
         except Exception as e:
-            print(f"アートワークファイル削除エラー: {e}")
+            logger.warning("アートワークファイル削除エラー: %s", e)
+        
+        # 削除したファイルを参照しないよう、アルバムごとの取得結果と処理済みアルバムを破棄
+        self._artwork_cache.clear()
+        self.processed_albums.clear()
+        
+        # 処理が終わったためセッションの接続を閉じる（再度使用した場合は接続し直す）
+        self.artwork_fetcher.close()
 
 
 if __name__ == "__main__":
     import sys
     
+    # --quiet 指定時は警告・エラーのみ表示
+    args = sys.argv[1:]
+    quiet = '--quiet' in args
+    if quiet:
+        args = [arg for arg in args if arg != '--quiet']
+    logging.basicConfig(level=logging.WARNING if quiet else logging.INFO, format='%(message)s')
+    
     downloader = AlbumArtworkBatchDownloader()
     
     # コマンドライン引数をチェック
-    if len(sys.argv) < 2:
-        print("使用方法: python3 add_album_artworks.py {アルバム名}")
+    if not args:
+        print("使用方法: python3 add_album_artworks.py [--quiet] {アルバム名}")
         print("例: python3 add_album_artworks.py Furusato")
         print("例: python3 add_album_artworks.py \"My Album Name\"")
         sys.exit(1)
     
     # コマンドライン引数からアルバム名を取得（複数の引数を結合）
-    album_name = " ".join(sys.argv[1:]).strip()
+    album_name = " ".join(args).strip()
     
     if album_name:
-        print(f"アルバム '{album_name}' 内の全楽曲のアートワークを取得・埋め込みを実行します")
-        print("=" * 80)
+        logger.info("アルバム '%s' 内の全楽曲のアートワークを取得・埋め込みを実行します", album_name)
+        logger.info("=" * 80)
         
         # アルバム内全楽曲のアートワークを取得・埋め込み
         success = downloader.download_album_artworks(album_name)
         
         if success:
-            print("\nアートワークの取得・埋め込みが完了しました！")
+            logger.info("\nアートワークの取得・埋め込みが完了しました！")
             downloader.show_summary()
         else:
-            print("\nアートワークの取得・埋め込みに失敗しました")
+            logger.warning("\nアートワークの取得・埋め込みに失敗しました")
         
         # 処理完了後にアートワークファイルを削除
         downloader.cleanup_artwork_files()
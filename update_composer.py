@@ -1,12 +1,56 @@
+import functools
+import logging
+import os
+import re
 import sys
-from pathlib import Path
-from typing import Optional, Dict, List
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple
 from src.itunes_album_finder import iTunesAlbumFinder
 from src.audio_metadata_extractor import AudioMetadataExtractor
 from src.tower_records_scraper import TowerRecordsScraper
 from src.audio_metadata_writer import AudioMetadataWriter
 
 
+# 曲名の比較用の正規化・曲番号の抽出に使う正規表現
+_WS_RE = re.compile(r'\s+')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_LEADNUM_RE = re.compile(r'^(\d+)')
+
+# composerフィールドに含めるクレジットの種類（この順に連結）
+_COMPOSER_CREDIT_LABELS = ('作詞', '作曲', '編曲')
+
+# 部分一致（類似度・部分文字列）で照合する曲名の最小文字数（正規化後）
+MIN_PARTIAL_MATCH_LENGTH = 3
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_text(text: str) -> str:
+    """全角・半角を統一し、比較用に正規化（同じ文字列の結果はキャッシュ）"""
+    if not text:
+        return ""
+    # 全角英数字を半角に変換
+    text = unicodedata.normalize('NFKC', text)
+    # 小文字に変換
+    text = text.lower()
+    # 空白文字を統一
+    text = _WS_RE.sub(' ', text)
+    # 前後の空白を削除
+    text = text.strip()
+    # 記号を削除（比較用）
+    text = _PUNCT_RE.sub('', text)
+    return text
+
+
+@functools.lru_cache(maxsize=4096)
+def _char_mask(text: str) -> int:
+    """ASCII文字列に含まれる文字の集合をビットマスクで表現（同じ文字列の結果はキャッシュ）"""
+    mask = 0
+    for char in text:
+        mask |= 1 << ord(char)
+    return mask
+
+
 class AlbumComposerUpdater:
     """アルバム内全楽曲のcomposer情報を更新するクラス"""
     
@@ -39,19 +83,21 @@ class AlbumComposerUpdater:
         total_success = 0
         total_songs = 0
         
+        # Tower Recordsの検索・商品詳細ページの解析は見つかった全アルバム分をまとめて並列で実行する
+        print(f"\n--- Tower Records検索フェーズ ---")
+        tower_search_results = self._search_albums_on_tower(results)
+        all_track_credits = self._get_track_credits_from_tower(results, tower_search_results)
+        
         # 見つかったアルバムを処理
-        for i, album_info in enumerate(results, 1):
+        for i, (album_info, track_credits) in enumerate(zip(results, all_track_credits), 1):
             print(f"\n【{i}】アーティスト: {album_info['artist_name']}")
             print(f"    アルバム: {album_info['album_name']}")
             print(f"    楽曲数: {album_info['audio_file_count']}曲")
             print("-" * 60)
             
-            # Tower Recordsから作詞・作曲・編曲情報を取得
-            album_name = album_info['album_name']
-            artist_name = album_info['artist_name']
-            
-            print(f"\n--- Tower Records検索フェーズ ---")
-            track_credits = self._get_track_credits_from_tower(album_name, artist_name)
+            # Tower Recordsの曲名の正規化・曲番号の索引作成はアルバムごとに1回だけ行う
+            normalized_credits = self._normalize_track_credits(track_credits)
+            credits_by_number = self._index_track_credits_by_number(track_credits)
             
             if track_credits:
                 print(f"Tower Recordsから {len(track_credits)} 曲の情報を取得")
@@ -60,14 +106,16 @@ class AlbumComposerUpdater:
             
             print(f"\n--- Composer情報埋め込みフェーズ ---")
             
+            # アルバム内の全楽曲のメタデータを並列で取得（表示・更新は元の楽曲順で行う）
+            audio_files = album_info['audio_files']
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                all_metadata = list(executor.map(self.extractor.extract_metadata, audio_files))
+            
             # アルバム内の各楽曲を処理
-            for j, audio_file in enumerate(album_info['audio_files'], 1):
-                file_name = Path(audio_file).name
+            for j, (audio_file, metadata) in enumerate(zip(audio_files, all_metadata), 1):
+                file_name = os.path.basename(audio_file)
                 print(f"\n  [{j:2d}] {file_name}")
                 
-                # 楽曲のメタデータを取得
-                metadata = self.extractor.extract_metadata(audio_file)
-                
                 if metadata:
                     total_songs += 1
                     track_title = metadata['title']
@@ -77,7 +125,9 @@ class AlbumComposerUpdater:
                     print(f"       現在のComposer: {current_composer or '(空)'}")
                     
                     # Tower Recordsの情報から該当する楽曲を検索
-                    matching_credit = self._find_matching_track_credit(track_title, track_credits)
+                    matching_credit = self._find_matching_track_credit(
+                        track_title, track_credits, normalized_credits, credits_by_number
+                    )
                     
                     if matching_credit:
                         # 作詞・作曲・編曲情報を組み合わせてcomposerフィールドに埋め込み
@@ -96,54 +146,112 @@ class AlbumComposerUpdater:
                         print(f"       - Tower Recordsに該当する楽曲情報が見つかりませんでした")
                 else:
                     print("       メタデータを取得できませんでした")
-        
+    
         print(f"\n" + "=" * 80)
         print(f"処理完了: {total_success}/{total_songs} 件のComposer情報を更新")
         return total_success > 0
     
-    def _get_track_credits_from_tower(self, album_name: str, artist_name: str) -> List[Dict]:
+    def _search_albums_on_tower(self, album_infos: List[Dict]) -> List[List[Dict]]:
         """
-        Tower Recordsから楽曲のクレジット情報を取得
+        複数のアルバムをTower Recordsでまとめて検索（並列実行、レート制限は全体で共有）
         
         Args:
-            album_name: アルバム名
-            artist_name: アーティスト名
+            album_infos: アルバムの情報リスト
         
         Returns:
-            楽曲クレジット情報のリスト
+            各アルバムの検索結果のリスト（album_infosと同じ順序）
         """
+        queries = [(album_info['album_name'], album_info['artist_name']) for album_info in album_infos]
         try:
-            # Tower Recordsでアルバムを検索
-            search_results = self.scraper.search_album(album_name, artist_name)
-            
+            return self.scraper.search_albums(queries)
+        except Exception as e:
+            print(f"  Tower Records検索エラー: {e}")
+            return [[] for _ in queries]
+    
+    def _get_track_credits_from_tower(self, album_infos: List[Dict],
+                                      tower_search_results: List[List[Dict]]) -> List[List[Dict]]:
+        """
+        Tower Recordsの検索結果から、各アルバムの楽曲のクレジット情報をまとめて取得
+        
+        各アルバムの最初の検索結果の商品詳細ページを並列で取得・解析する（レート制限は全体で共有）
+        
+        Args:
+            album_infos: アルバムの情報リスト
+            tower_search_results: 各アルバムのTower Recordsの検索結果
+        
+        Returns:
+            各アルバムの楽曲クレジット情報のリスト（album_infosと同じ順序）
+        """
+        # 解析する商品詳細ページのリンク（取得できないアルバムはNone）
+        product_urls = []
+        for album_info, search_results in zip(album_infos, tower_search_results):
+            album_name = album_info['album_name']
             if not search_results:
-                print("  Tower Recordsで検索結果が見つかりませんでした")
-                return []
+                print(f"  Tower Recordsで検索結果が見つかりませんでした: {album_name}")
+                product_urls.append(None)
+                continue
             
             # 最初の検索結果の詳細を取得
             first_result = search_results[0]
             if not first_result.get('link'):
-                print("  商品詳細ページのリンクが見つかりませんでした")
-                return []
+                print(f"  商品詳細ページのリンクが見つかりませんでした: {album_name}")
+                product_urls.append(None)
+                continue
             
             print(f"  商品詳細ページを解析中: {first_result['title']}")
-            
+            product_urls.append(first_result['link'])
+        
+        try:
             # 収録内容を解析
-            track_credits = self.scraper.parse_track_credits(first_result['link'])
-            
-            return track_credits
+            parsed = iter(self.scraper.parse_many_track_credits([url for url in product_urls if url]))
+            return [next(parsed) if url else [] for url in product_urls]
             
         except Exception as e:
             print(f"  Tower Records情報取得エラー: {e}")
-            return []
+            return [[] for _ in product_urls]
     
-    def _find_matching_track_credit(self, track_title: str, track_credits: List[Dict]) -> Optional[Dict]:
+    def _normalize_track_credits(self, track_credits: List[Dict]) -> List[Tuple[str, Dict]]:
+        """
+        クレジット情報の曲名を比較用に正規化
+        
+        Args:
+            track_credits: Tower Recordsから取得したクレジット情報リスト
+        
+        Returns:
+            (正規化された曲名, クレジット情報) のリスト
+        """
+        return [(_normalize_text(credit.get('title', '')), credit) for credit in track_credits]
+    
+    def _index_track_credits_by_number(self, track_credits: List[Dict]) -> Dict[str, Dict]:
+        """
+        クレジット情報を曲番号で引けるようにする
+        
+        Args:
+            track_credits: Tower Recordsから取得したクレジット情報リスト
+        
+        Returns:
+            曲番号をキーとしたクレジット情報の辞書（同じ曲番号がある場合は先のものを優先）
+        """
+        credits_by_number = {}
+        for credit in track_credits:
+            track_number = credit.get('track_number')
+            if track_number:
+                credits_by_number.setdefault(track_number, credit)
+        return credits_by_number
+    
+    def _find_matching_track_credit(self, track_title: str, track_credits: List[Dict],
+                                    normalized_credits: Optional[List[Tuple[str, Dict]]] = None,
+                                    credits_by_number: Optional[Dict[str, Dict]] = None) -> Optional[Dict]:
         """
         楽曲タイトルに対応するクレジット情報を検索
         
         Args:
             track_title: 楽曲タイトル
             track_credits: Tower Recordsから取得したクレジット情報リスト
+            normalized_credits: _normalize_track_creditsで正規化済みのクレジット情報
+                （省略時はtrack_creditsから作成）
+            credits_by_number: _index_track_credits_by_numberで作成した曲番号の索引
+                （省略時はtrack_creditsから作成）
         
         Returns:
             該当するクレジット情報
@@ -151,59 +259,37 @@ class AlbumComposerUpdater:
         if not track_title or not track_credits:
             return None
         
-        import unicodedata
-        import re
-        
-        def normalize_text(text):
-            """全角・半角を統一し、比較用に正規化"""
-            if not text:
-                return ""
-            # 全角英数字を半角に変換
-            text = unicodedata.normalize('NFKC', text)
-            # 小文字に変換
-            text = text.lower()
-            # 空白文字を統一
-            text = re.sub(r'\s+', ' ', text)
-            # 前後の空白を削除
-            text = text.strip()
-            # 記号を削除（比較用）
-            text = re.sub(r'[^\w\s]', '', text)
-            return text
+        if normalized_credits is None:
+            normalized_credits = self._normalize_track_credits(track_credits)
         
         # 正規化されたトラックタイトル
-        normalized_track_title = normalize_text(track_title)
+        normalized_track_title = _normalize_text(track_title)
         
         # 完全一致を優先
-        for credit in track_credits:
-            tower_title = credit.get('title', '')
-            normalized_tower_title = normalize_text(tower_title)
+        for normalized_tower_title, credit in normalized_credits:
             if normalized_tower_title == normalized_track_title:
                 return credit
         
-        # 部分一致を検索
-        for credit in track_credits:
-            tower_title = credit.get('title', '')
-            normalized_tower_title = normalize_text(tower_title)
-            
-            if normalized_tower_title:
-                # 1. 8割以上の文字列一致をチェック
-                similarity_ratio = self._calculate_similarity_ratio(normalized_track_title, normalized_tower_title)
-                if similarity_ratio >= 0.8:
-                    return credit
-                
-                # 2. 部分文字列マッチング
-                if (normalized_track_title in normalized_tower_title or 
-                    normalized_tower_title in normalized_track_title):
-                    return credit
+        # 部分一致を検索（短すぎる曲名は誤一致しやすいため行わない）
+        if len(normalized_track_title) >= MIN_PARTIAL_MATCH_LENGTH:
+            for normalized_tower_title, credit in normalized_credits:
+                if normalized_tower_title:
+                    # 1. 8割以上の文字列一致をチェック
+                    similarity_ratio = self._calculate_similarity_ratio(normalized_track_title, normalized_tower_title)
+                    if similarity_ratio >= 0.8:
+                        return credit
+                    
+                    # 2. 部分文字列マッチング
+                    if (normalized_track_title in normalized_tower_title or 
+                        normalized_tower_title in normalized_track_title):
+                        return credit
         
         # 楽曲番号による一致を試行
-        track_number_match = re.search(r'^(\d+)', track_title)
+        track_number_match = _LEADNUM_RE.search(track_title)
         if track_number_match:
-            track_number = track_number_match.group(1)
-            for credit in track_credits:
-                credit_number = credit.get('track_number', '')
-                if credit_number == track_number:
-                    return credit
+            if credits_by_number is None:
+                credits_by_number = self._index_track_credits_by_number(track_credits)
+            return credits_by_number.get(track_number_match.group(1))
         
         return None
     
@@ -221,17 +307,23 @@ class AlbumComposerUpdater:
         if not text1 or not text2:
             return 0.0
         
-        # 共通文字数を計算
-        set1 = set(text1)
-        set2 = set(text2)
-        intersection = set1.intersection(set2)
-        union = set1.union(set2)
-        
-        if not union:
+        # 共通文字数を計算（ASCIIのみの場合はビットマスクの演算で集合を作らずに求める）
+        if text1.isascii() and text2.isascii():
+            mask1 = _char_mask(text1)
+            mask2 = _char_mask(text2)
+            intersection_count = (mask1 & mask2).bit_count()
+            union_count = (mask1 | mask2).bit_count()
+        else:
+            set1 = set(text1)
+            set2 = set(text2)
+            intersection_count = len(set1 & set2)
+            union_count = len(set1 | set2)
+        
+        if not union_count:
             return 0.0
         
         # Jaccard係数を計算
-        jaccard = len(intersection) / len(union)
+        jaccard = intersection_count / union_count
         
         # 長さの類似度も考慮
         length_similarity = min(len(text1), len(text2)) / max(len(text1), len(text2))
@@ -251,21 +343,8 @@ class AlbumComposerUpdater:
         Returns:
             フォーマットされたcomposer情報
         """
-        parts = []
-        
-        # 作詞者
-        if '作詞' in credit:
-            parts.append(f"作詞: {credit['作詞']}")
-        
-        # 作曲者
-        if '作曲' in credit:
-            parts.append(f"作曲: {credit['作曲']}")
-        
-        # 編曲者
-        if '編曲' in credit:
-            parts.append(f"編曲: {credit['編曲']}")
-        
-        return '/'.join(parts) if parts else ''
+        # 作詞者・作曲者・編曲者の順に連結
+        return '/'.join(f"{label}: {credit[label]}" for label in _COMPOSER_CREDIT_LABELS if label in credit)
     
     def close(self):
         """リソースを解放"""
@@ -274,6 +353,8 @@ class AlbumComposerUpdater:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     updater = AlbumComposerUpdater()
     
     # コマンドライン引数をチェック